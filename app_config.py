@@ -26,6 +26,9 @@ class Config:
     api_port: int = int(os.getenv("API_PORT", "8000"))
     api_host: str = os.getenv("API_HOST", "0.0.0.0")
     debug: bool = os.getenv("DEBUG", "False").lower() == "true"
+    api_workers: int = int(os.getenv("API_WORKERS", "0"))  # 0 = auto (2 x CPU + 1)
+    api_limit_concurrency: int = int(os.getenv("API_LIMIT_CONCURRENCY", "256"))  # 0 = unlimited
+    metrics_cache_ttl: float = float(os.getenv("METRICS_CACHE_TTL", "5"))  # Seconds /metrics output is reused; 0 = no caching
     
     # Analysis Settings
     max_report_length: int = int(os.getenv("MAX_REPORT_LENGTH", "5000"))
@@ -37,16 +40,28 @@ class Config:
     # Rate limiting
     rate_limit_max_requests: int = int(os.getenv("RATE_LIMIT_MAX_REQUESTS", "60"))
     rate_limit_window_seconds: int = int(os.getenv("RATE_LIMIT_WINDOW_SECONDS", "60"))
+    rate_limit_redis_enabled: bool = os.getenv("RATE_LIMIT_REDIS_ENABLED", "false").lower() == "true"  # Share limits via REDIS_URL
     
     # Caching
     cache_max_size: int = int(os.getenv("CACHE_MAX_SIZE", "100"))
     cache_ttl_seconds: int = int(os.getenv("CACHE_TTL_SECONDS", "3600"))
+    cache_redis_enabled: bool = os.getenv("CACHE_REDIS_ENABLED", "false").lower() == "true"  # Share cache via REDIS_URL
     
     # CORS
     cors_origins: str = os.getenv("CORS_ORIGINS", "*")  # Comma-separated or "*" for all
     
     # LLM limits
     llm_max_contract_size: int = int(os.getenv("LLM_MAX_CONTRACT_SIZE", "50000"))  # Increased from 5000
+    llm_max_contract_tokens: int = int(os.getenv("LLM_MAX_CONTRACT_TOKENS", "14000"))  # Used when tiktoken is installed
+    llm_minify_contract: bool = os.getenv("LLM_MINIFY_CONTRACT", "true").lower() == "true"  # Strip comments/indentation from LLM prompts
+    llm_cache_max_size: int = int(os.getenv("LLM_CACHE_MAX_SIZE", "256"))  # 0 disables the audit result cache
+    llm_request_timeout: float = float(os.getenv("LLM_REQUEST_TIMEOUT", "60"))  # Seconds per API request (sync and async)
+    llm_use_batch_api: bool = os.getenv("LLM_USE_BATCH_API", "false").lower() == "true"  # audit_many via OpenAI Batch API
+    llm_batch_poll_seconds: float = float(os.getenv("LLM_BATCH_POLL_SECONDS", "30"))
+    llm_pack_max_contracts: int = int(os.getenv("LLM_PACK_MAX_CONTRACTS", "8"))  # Contracts per request in audit_many_concatenated; <2 disables packing
+    llm_max_concurrency: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # Concurrent async API calls per worker
+    llm_requests_per_minute: int = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "0"))  # 0 = no proactive RPM throttle
+    llm_tokens_per_minute: int = int(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))  # 0 = no proactive TPM throttle
     
     # Analysis constants
     max_contract_size_chars: int = int(os.getenv("MAX_CONTRACT_SIZE_CHARS", "1000000"))  # ~1MB
@@ -5,10 +5,17 @@ Provides endpoints for contract analysis and report generation
 
 import time
 import json
+import codecs
+import zipfile
+import importlib.util
+import httpx
+from concurrent.futures import ThreadPoolExecutor
 import asyncio
-from typing import Optional, List
+from contextlib import asynccontextmanager
+from typing import Optional, List, Tuple
+from functools import lru_cache
 from datetime import datetime, timezone
-from fastapi import FastAPI, HTTPException, File, UploadFile, Depends, Request
+from fastapi import FastAPI, HTTPException, File, UploadFile, Depends, Request, BackgroundTasks
 from fastapi.responses import JSONResponse, HTMLResponse, Response
 from pathlib import Path
 from fastapi.middleware.cors import CORSMiddleware
@@ -24,9 +31,9 @@ from exceptions import (
     AnalysisException, ValidationError, LLMAuditException,
     PatternCompilationError, ScannerException
 )
-from input_validator import validate_contract_code, sanitize_contract_code, validate_contract_name
+from input_validator import validate_and_sanitize, validate_contract_name
 from webhook_manager import webhook_manager
-from monitoring import MetricsMiddleware, record_analysis, get_metrics_endpoint, get_health_check
+from monitoring import MetricsMiddleware, record_analysis, get_metrics_endpoint, get_health_check, track_active_analysis
 
 # Optional PDF support
 try:
@@ -50,6 +57,25 @@ except ImportError:
     def get_job_status(*args, **kwargs):
         return {"status": "unavailable", "error": "Queue system not available"}
 
+# Optional fast JSON encoding
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# Response class for dict payloads: orjson-backed when available
+DefaultJSONResponse = ORJSONResponse if ORJSON_AVAILABLE else JSONResponse
+
+
+def _json_bytes(content) -> bytes:
+    """Serialize content to JSON bytes (orjson when installed)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
 from multi_file_analyzer import multi_file_analyzer
 try:
     from professional_auditor import ProfessionalAuditor, ProfessionalAuditResult
@@ -101,25 +127,70 @@ from models import (
     ProfessionalAuditRequest
 )
 from fastapi.responses import JSONResponse
-import uuid
 
 
+# Load configuration once; get_config() is memoized, handlers use this instance
+config = get_config()
+MAX_FILE_SIZE_BYTES = config.max_file_size_mb * 1024 * 1024
+# Zip-bomb limits for /analyze-project (uncompressed sizes)
+MAX_EXTRACTED_FILE_BYTES = MAX_FILE_SIZE_BYTES
+MAX_EXTRACTED_TOTAL_BYTES = MAX_FILE_SIZE_BYTES * 10
+UPLOAD_CHUNK_SIZE = 1 << 20
+# Accepted upload suffixes (compared case-insensitively)
+_SOL_SUFFIX = ".sol"
+_ZIP_SUFFIX = ".zip"
+# Concurrent analyses per /analyze-batch request
+BATCH_CONCURRENCY = 4
+
 # Setup logging
-logger = setup_logging(log_level="INFO" if not get_config().debug else "DEBUG")
+logger = setup_logging(log_level="INFO" if not config.debug else "DEBUG")
 app_logger = get_logger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Own the app-wide resources: the analysis executor, the pooled HTTP
+    client for outbound calls (webhooks), the cache/rate limiter Redis
+    clients and the LLM auditor's clients
+    """
+    _analysis_executor()
+    app.state.http = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        timeout=10.0
+    )
+    webhook_manager.use_client(app.state.http)
+    try:
+        yield
+    finally:
+        if llm_auditor:
+            await llm_auditor.aclose()
+        await webhook_manager.aclose()
+        await app.state.http.aclose()
+        if analysis_cache:
+            await analysis_cache.aclose()
+        if rate_limiter is not None:
+            await rate_limiter.aclose()
+        executor = getattr(app.state, "analysis_executor", None)
+        app.state.analysis_executor = None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
 # Initialize app
 app = FastAPI(
     title="Solidity Vuln Scanner API",
     description="AI-powered vulnerability detection for Ethereum smart contracts",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=DefaultJSONResponse,
+    lifespan=lifespan
 )
 
 # Add request ID middleware for tracing
 @app.middleware("http")
 async def add_request_id(request: Request, call_next):
     """Add unique request ID to each request for tracing"""
-    request_id = str(uuid.uuid4())
+    request_id = os.urandom(16).hex()
     request.state.request_id = request_id
     response = await call_next(request)
     response.headers["X-Request-ID"] = request_id
@@ -130,7 +201,7 @@ async def add_request_id(request: Request, call_next):
 async def http_exception_handler(request: Request, exc: HTTPException):
     """Standardized error response format"""
     request_id = getattr(request.state, "request_id", "unknown")
-    return JSONResponse(
+    return DefaultJSONResponse(
         status_code=exc.status_code,
         content=ErrorResponse(
             error=exc.detail if isinstance(exc.detail, str) else "An error occurred",
@@ -145,7 +216,7 @@ async def general_exception_handler(request: Request, exc: Exception):
     """Handle unexpected exceptions"""
     request_id = getattr(request.state, "request_id", "unknown")
     app_logger.error(f"Unhandled exception: {exc}", exc_info=True, extra={"request_id": request_id})
-    return JSONResponse(
+    return DefaultJSONResponse(
         status_code=500,
         content=ErrorResponse(
             error="Internal server error",
@@ -168,30 +239,50 @@ def _include_v1_router():
 # Call after app is fully initialized
 _include_v1_router()
 
-# Add CORS middleware (configurable with security restrictions)
-config = get_config()
-if config.cors_origins == "*":
-    cors_origins = ["*"]
-    # Security warning: wildcard + credentials is dangerous
-    if config.production_mode:
-        app_logger.warning(
-            "⚠️  SECURITY WARNING: CORS allows all origins with credentials enabled. "
-            "This is insecure. Set CORS_ORIGINS to specific domains in production."
-        )
-    # Disable credentials when using wildcard (security best practice)
-    allow_creds = False
-else:
-    cors_origins = [origin.strip() for origin in config.cors_origins.split(",") if origin.strip()]
-    allow_creds = True  # Safe to allow credentials with specific origins
+@lru_cache(maxsize=8)
+def _compute_cors_origins(cors_setting: str, production_mode: bool) -> Tuple[Tuple[str, ...], bool]:
+    """
+    Resolve the CORS_ORIGINS setting into allowed origins and credentials flag
+    
+    Pure function of its (hashable) arguments, memoized so repeated app
+    setup in the same process (e.g. preloaded workers) parses it once;
+    safe to call before or after fork.
+    
+    Args:
+        cors_setting: Raw CORS_ORIGINS value ("*" or comma-separated origins)
+        production_mode: Whether the app runs in production mode
+        
+    Returns:
+        Tuple of (allowed_origins, allow_credentials)
+    """
+    if cors_setting == "*":
+        origins = ("*",)
+        # Security warning: wildcard + credentials is dangerous
+        if production_mode:
+            app_logger.warning(
+                "⚠️  SECURITY WARNING: CORS allows all origins with credentials enabled. "
+                "This is insecure. Set CORS_ORIGINS to specific domains in production."
+            )
+        # Disable credentials when using wildcard (security best practice)
+        allow_creds = False
+    else:
+        origins = tuple(origin.strip() for origin in cors_setting.split(",") if origin.strip())
+        allow_creds = True  # Safe to allow credentials with specific origins
+    
+    # Default to localhost if no origins specified and not wildcard
+    if not origins or (origins == ("*",) and production_mode):
+        origins = ("http://localhost:8501", "http://localhost:3000")
+        app_logger.warning("CORS origins defaulted to localhost. Set CORS_ORIGINS for production.")
+    
+    return origins, allow_creds
+
 
-# Default to localhost if no origins specified and not wildcard
-if not cors_origins or (cors_origins == ["*"] and config.production_mode):
-    cors_origins = ["http://localhost:8501", "http://localhost:3000"]
-    app_logger.warning("CORS origins defaulted to localhost. Set CORS_ORIGINS for production.")
+# Add CORS middleware (configurable with security restrictions)
+cors_origins, allow_creds = _compute_cors_origins(config.cors_origins, config.production_mode)
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=cors_origins,
+    allow_origins=list(cors_origins),
     allow_credentials=allow_creds,
     allow_methods=["GET", "POST", "OPTIONS"],  # Restrict methods
     allow_headers=["Content-Type", "Authorization", "X-API-Key"],  # Restrict headers
@@ -204,14 +295,10 @@ if RateLimitMiddleware is not None and rate_limiter is not None:
 else:
     print("⚠️  Rate limiting middleware not available")
 
-# Initialize components
-try:
-    config = get_config()
-    app_logger.info("Configuration loaded successfully")
-except Exception as e:
-    app_logger.error(f"Failed to load configuration: {e}")
-    raise
+# Request metrics (outermost, so rate-limited responses are counted too)
+app.add_middleware(MetricsMiddleware)
 
+# Initialize components
 try:
     static_analyzer = StaticAnalyzer()
     app_logger.info("Static analyzer initialized")
@@ -219,6 +306,27 @@ except Exception as e:
     app_logger.error(f"Failed to initialize static analyzer: {e}")
     raise
 
+# Professional auditor is stateless per audit; share one instance
+professional_auditor = ProfessionalAuditor() if PROFESSIONAL_AUDIT_AVAILABLE else None
+
+def _analysis_executor() -> ThreadPoolExecutor:
+    """
+    Bounded pool for blocking work offloaded from the event loop (project
+    analysis, sync LLM audits)
+    
+    Kept on app.state for the current startup/shutdown cycle and created
+    again on first use after a shutdown; threads start on first submit.
+    """
+    executor = getattr(app.state, "analysis_executor", None)
+    if executor is None:
+        executor = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 1,
+            thread_name_prefix="analyze"
+        )
+        app.state.analysis_executor = executor
+    return executor
+
+
 # Initialize LLM ONLY if explicitly enabled AND API key is provided
 # Default is disabled (free mode - static analysis only)
 llm_auditor = None
@@ -263,10 +371,10 @@ async def health_check_detailed():
 @app.get("/metrics")
 async def metrics():
     """Prometheus metrics endpoint"""
-    from monitoring import generate_latest, CONTENT_TYPE_LATEST
+    from monitoring import latest_metrics, CONTENT_TYPE_LATEST
     from fastapi.responses import Response
     return Response(
-        content=generate_latest(),
+        content=latest_metrics(),
         media_type=CONTENT_TYPE_LATEST
     )
 
@@ -302,14 +410,46 @@ async def get_job(task_id: str):
     return status
 
 
+def _extract_and_analyze(temp_zip_path: str, extract_dir: str):
+    """
+    Extract a project archive and run multi-file analysis (blocking)
+    
+    Args:
+        temp_zip_path: Path to the uploaded zip archive
+        extract_dir: Empty directory to extract into
+        
+    Returns:
+        Tuple of (project_type, results by file path)
+        
+    Raises:
+        HTTPException: If the archive exceeds the extraction size limits
+    """
+    with zipfile.ZipFile(temp_zip_path, 'r') as zip_ref:
+        # Extract member by member with uncompressed size caps
+        # (CRCs are verified during extraction)
+        total_uncompressed = 0
+        for info in zip_ref.infolist():
+            total_uncompressed += info.file_size
+            if (info.file_size > MAX_EXTRACTED_FILE_BYTES
+                    or total_uncompressed > MAX_EXTRACTED_TOTAL_BYTES):
+                raise HTTPException(
+                    status_code=413,
+                    detail="Archive contents exceed the extraction size limit"
+                )
+            zip_ref.extract(info, extract_dir)
+    
+    project_path = Path(extract_dir)
+    results = multi_file_analyzer.analyze_project(project_path)
+    return multi_file_analyzer.detect_project_type(project_path), results
+
+
 @app.post("/analyze-project")
 async def analyze_project(file: UploadFile = File(...)):
     """Analyze a project (zip file with contracts) with secure file handling"""
-    import zipfile
     import tempfile
     from input_validator import sanitize_filename
     
-    if not file.filename or not file.filename.endswith('.zip'):
+    if not file.filename or not file.filename.lower().endswith(_ZIP_SUFFIX):
         raise HTTPException(status_code=400, detail="File must be a .zip archive")
     
     # Sanitize filename
@@ -320,41 +460,40 @@ async def analyze_project(file: UploadFile = File(...)):
         with tempfile.TemporaryDirectory() as tmpdir:
             # Save uploaded file to secure location
             temp_zip_path = os.path.join(tmpdir, safe_filename)
-            content = await file.read()
-            
-            # Check file size before writing
-            max_size = config.max_file_size_mb * 1024 * 1024
-            if len(content) > max_size:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"File too large ({len(content)} bytes, max {max_size} bytes)"
-                )
             
+            # Stream upload to disk, enforcing the size limit as we go
+            max_size = MAX_FILE_SIZE_BYTES
+            total = 0
             with open(temp_zip_path, 'wb') as f:
-                f.write(content)
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    total += len(chunk)
+                    if total > max_size:
+                        raise HTTPException(
+                            status_code=413,
+                            detail=f"File too large (max {max_size} bytes)"
+                        )
+                    f.write(chunk)
             
             # Extract and analyze (zipfile auto-handles traversal attempts)
             extract_dir = os.path.join(tmpdir, "extracted")
             os.mkdir(extract_dir)
             
-            with zipfile.ZipFile(temp_zip_path, 'r') as zip_ref:
-                # Validate zip file first
-                zip_ref.testzip()
-                # Extract to secure directory
-                zip_ref.extractall(extract_dir)
-            
-            project_path = Path(extract_dir)
-            results = multi_file_analyzer.analyze_project(project_path)
+            # Extraction and analysis are blocking; keep them off the event loop
+            project_type, results = await asyncio.get_running_loop().run_in_executor(
+                _analysis_executor(), _extract_and_analyze, temp_zip_path, extract_dir
+            )
             
             # Convert Path objects to strings for JSON serialization
             return {
-                "project_type": multi_file_analyzer.detect_project_type(project_path),
+                "project_type": project_type,
                 "files_analyzed": len(results),
                 "results": {
                     str(k): v.to_dict() for k, v in results.items()
                 }
             }
             # Temporary directory auto-cleans up here
+    except HTTPException:
+        raise
     except zipfile.BadZipFile:
         raise HTTPException(status_code=400, detail="Invalid zip file")
     except Exception as e:
@@ -362,35 +501,49 @@ async def analyze_project(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"Project analysis failed: {str(e)}")
 
 
-async def _analyze_static_and_llm(request: ContractAnalysisRequest, start_time: float):
+def _utcnow_iso() -> str:
+    """Current UTC time as ISO 8601 with millisecond precision and a Z suffix"""
+    now = datetime.now(timezone.utc)
+    return f"{now:%Y-%m-%dT%H:%M:%S}.{now.microsecond // 1000:03d}Z"
+
+
+def _llm_cache_key(contract_code: str, contract_name: str) -> bytes:
+    """AnalysisCache key for an LLM audit of this code with the current model"""
+    return analysis_cache.hash_key(
+        contract_code,
+        contract_name,
+        kind=f"llm:{llm_auditor.provider}:{llm_auditor.model}"
+    )
+
+
+@track_active_analysis
+async def _analyze_to_dict(request: ContractAnalysisRequest, start_time: float) -> dict:
     """
-    Helper function to run static analysis and optional LLM audit
+    Run static analysis and optional LLM audit, returning the plain report dict
+    
+    Report generators (SARIF, PDF) consume this directly, skipping the
+    response model round-trip.
     
     Args:
         request: ContractAnalysisRequest with contract code
-        start_time: Timestamp when analysis started (for timing calculation)
+        start_time: time.perf_counter() value when analysis started
         
     Returns:
-        Complete security analysis report
+        Report dict with the ContractAnalysisResponse fields
         
     Raises:
         HTTPException: For validation or analysis errors
     """
     # Validate and sanitize input
-    is_valid, error_msg = validate_contract_code(request.contract_code)
-    if not is_valid:
-        app_logger.warning(f"Invalid contract code: {error_msg}")
-        raise HTTPException(status_code=400, detail=error_msg)
-    
-    is_valid, error_msg = validate_contract_name(request.contract_name)
+    sanitized_code, is_valid, error_msg = validate_and_sanitize(
+        request.contract_code,
+        request.contract_name
+    )
     if not is_valid:
-        app_logger.warning(f"Invalid contract name: {error_msg}")
+        app_logger.warning("Invalid contract input: %s", error_msg)
         raise HTTPException(status_code=400, detail=error_msg)
     
-    # Sanitize contract code
-    sanitized_code = sanitize_contract_code(request.contract_code)
-    
-    app_logger.info(f"Analyzing contract: {request.contract_name} ({len(sanitized_code)} chars)")
+    app_logger.info("Analyzing contract: %s (%d chars)", request.contract_name, len(sanitized_code))
     
     # Run static analysis
     try:
@@ -398,7 +551,7 @@ async def _analyze_static_and_llm(request: ContractAnalysisRequest, start_time:
             sanitized_code,
             request.contract_name
         )
-        app_logger.info(f"Static analysis completed: {len(static_result.vulnerabilities)} vulnerabilities found")
+        app_logger.info("Static analysis completed: %d vulnerabilities found", len(static_result.vulnerabilities))
     except Exception as e:
         app_logger.error(f"Static analysis failed: {e}", exc_info=True)
         raise HTTPException(
@@ -406,41 +559,52 @@ async def _analyze_static_and_llm(request: ContractAnalysisRequest, start_time:
             detail=f"Static analysis failed: {str(e)}"
         )
     
-    # Run LLM audit if enabled and available (use async if available)
-    llm_result = None
-    if request.use_llm_audit and llm_auditor:
+    # Run LLM audit if enabled and available (use async if available).
+    # Audits are also kept in the shared (optionally Redis-backed) analysis
+    # cache so every worker reuses them, not just the one that ran the call
+    llm_audit = None
+    llm_key = None
+    if request.use_llm_audit and llm_auditor and analysis_cache:
+        llm_key = _llm_cache_key(sanitized_code, request.contract_name)
+        llm_audit = await analysis_cache.aget_by_hash(llm_key)
+    if request.use_llm_audit and llm_auditor and llm_audit is None:
         try:
             app_logger.info("Starting LLM audit...")
             # Use async method if available (we're in async context)
-            if hasattr(llm_auditor, 'audit_async') and llm_auditor.async_client:
+            if llm_auditor.supports_async:
                 llm_result = await llm_auditor.audit_async(
                     sanitized_code,
                     request.contract_name
                 )
             else:
                 # Fallback to sync (run in executor to avoid blocking)
-                import asyncio
-                loop = asyncio.get_event_loop()
-                llm_result = await loop.run_in_executor(
-                    None,
+                llm_result = await asyncio.get_running_loop().run_in_executor(
+                    _analysis_executor(),
                     llm_auditor.audit,
                     sanitized_code,
                     request.contract_name
                 )
-            app_logger.info(f"LLM audit completed: {llm_result.risk_assessment} (tokens: {llm_result.tokens_used})")
+            app_logger.info(
+                "LLM audit completed: %s (tokens: %d)",
+                llm_result.risk_assessment,
+                llm_result.tokens_used
+            )
+            llm_audit = llm_result.to_dict()
+            if llm_key is not None:
+                await analysis_cache.aset_by_hash(llm_key, llm_audit)
         except Exception as e:
             app_logger.error(f"LLM audit failed: {e}", exc_info=True)
             # Continue without LLM audit but log the error
             # Don't fail the entire request if LLM fails
     
     # Calculate analysis time
-    analysis_time_ms = int((time.time() - start_time) * 1000)
+    analysis_time_ms = int((time.perf_counter() - start_time) * 1000)
     static_result.analysis_time_ms = analysis_time_ms
     
     # Build response
     response_data = {
         "contract_name": static_result.contract_name,
-        "analysis_date": datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+        "analysis_date": _utcnow_iso(),
         "risk_score": static_result.risk_score,
         "severity": static_result._get_overall_severity(),
         "vulnerabilities": [v.to_dict() for v in static_result.vulnerabilities],
@@ -448,42 +612,87 @@ async def _analyze_static_and_llm(request: ContractAnalysisRequest, start_time:
         "analysis_time_ms": analysis_time_ms
     }
     
-    if llm_result:
-        response_data["llm_audit"] = llm_result.to_dict()
+    if llm_audit:
+        response_data["llm_audit"] = llm_audit
     
-    return ContractAnalysisResponse(**response_data)
-@app.post("/analyze", response_model=ContractAnalysisResponse)
-async def analyze_contract(request: ContractAnalysisRequest):
+    return response_data
+
+
+async def _analyze_static_and_llm(request: ContractAnalysisRequest, start_time: float):
     """
-    Main analysis endpoint
-    Performs static analysis and optional LLM audit
-    Uses caching to avoid re-analyzing identical contracts
+    Helper function to run static analysis and optional LLM audit
+    
+    Args:
+        request: ContractAnalysisRequest with contract code
+        start_time: time.perf_counter() value when analysis started
+        
+    Returns:
+        Complete security analysis report
+        
+    Raises:
+        HTTPException: For validation or analysis errors
+    """
+    return ContractAnalysisResponse(**await _analyze_to_dict(request, start_time))
+
+
+def _etag_for_key(cache_key: bytes) -> str:
+    """Weak ETag identifying a cached static analysis result"""
+    return f'W/"{cache_key[:16].hex()}"'
+
+
+async def _do_analyze(
+    request: ContractAnalysisRequest,
+    start_time: float,
+    cache_key: Optional[bytes] = None,
+    background_tasks: Optional[BackgroundTasks] = None,
+    lookup_done: bool = False
+) -> ContractAnalysisResponse:
     """
-    start_time = time.time()
+    Core of /analyze: cache lookup, analysis, cache store, metrics, webhooks
     
-    # Input validation is now handled in _analyze_static_and_llm
+    Shared by /analyze, /analyze-batch and /upload-and-analyze so internal
+    callers don't re-enter the route handler.
     
-    # Check cache first (if available)
-    if analysis_cache:
-        cached_result = analysis_cache.get(request.contract_code, request.contract_name)
-        if cached_result and not request.use_llm_audit:  # Only cache static analysis
-            return ContractAnalysisResponse(**cached_result)
+    Args:
+        request: ContractAnalysisRequest with contract code
+        start_time: time.perf_counter() value when analysis started
+        cache_key: Precomputed AnalysisCache.hash_key() digest, if the
+            caller already has one
+        background_tasks: Request BackgroundTasks; webhooks are sent
+            after the response when given
+        lookup_done: True when the caller already missed the cache for
+            cache_key, so the lookup isn't repeated
+        
+    Returns:
+        Complete security analysis report
+        
+    Raises:
+        HTTPException: For validation or analysis errors
+    """
+    # Check cache first (if available) - only static analysis is cached
+    if analysis_cache and not request.use_llm_audit:
+        if cache_key is None:
+            cache_key = analysis_cache.hash_key(request.contract_code, request.contract_name)
+        if not lookup_done:
+            cached_result = await analysis_cache.aget_by_hash(cache_key)
+            if cached_result:
+                return ContractAnalysisResponse(**cached_result)
     
     try:
-        result = _analyze_static_and_llm(request, start_time)
+        result = await _analyze_static_and_llm(request, start_time)
+        # Dump once; cache, metrics and webhooks all share this dict
+        result_dict = result.dict() if hasattr(result, 'dict') else result
         
         # Cache static-only results (if cache available)
         if analysis_cache and not request.use_llm_audit:
-            result_dict = result.dict() if hasattr(result, 'dict') else result
-            analysis_cache.set(request.contract_code, request.contract_name, result_dict)
+            await analysis_cache.aset_by_hash(cache_key, result_dict)
         
         # Record metrics
         try:
-            result_dict = result.dict() if hasattr(result, 'dict') else result
             record_analysis(
                 severity=result_dict.get('severity', 'UNKNOWN'),
                 has_llm=result_dict.get('llm_audit') is not None,
-                duration=(time.time() - start_time),
+                duration=(time.perf_counter() - start_time),
                 analysis_type="static",
                 vulnerability_count=len(result_dict.get('vulnerabilities', [])),
                 vulnerabilities=result_dict.get('vulnerabilities', [])
@@ -491,15 +700,22 @@ async def analyze_contract(request: ContractAnalysisRequest):
         except Exception as e:
             app_logger.warning(f"Metrics recording failed: {e}")
         
-        # Trigger webhooks (async, don't wait)
-        try:
-            result_dict = result.dict() if hasattr(result, 'dict') else result
-            asyncio.create_task(webhook_manager.notify_analysis_completed(
-                request.contract_name,
-                result_dict
-            ))
-        except Exception as e:
-            app_logger.warning(f"Webhook notification failed: {e}")
+        # Trigger webhooks after the response is sent (don't wait)
+        if webhook_manager.webhooks:
+            try:
+                if background_tasks is not None:
+                    background_tasks.add_task(
+                        webhook_manager.notify_analysis_completed,
+                        request.contract_name,
+                        result_dict
+                    )
+                else:
+                    asyncio.create_task(webhook_manager.notify_analysis_completed(
+                        request.contract_name,
+                        result_dict
+                    ))
+            except Exception as e:
+                app_logger.warning(f"Webhook notification failed: {e}")
         
         return result
     except HTTPException:
@@ -509,15 +725,63 @@ async def analyze_contract(request: ContractAnalysisRequest):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@app.post("/analyze", response_model=ContractAnalysisResponse)
+async def analyze_contract(
+    request: ContractAnalysisRequest,
+    http_request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks
+):
+    """
+    Main analysis endpoint
+    Performs static analysis and optional LLM audit
+    Uses caching to avoid re-analyzing identical contracts
+    Static-only results carry an ETag; a matching If-None-Match on a
+    cached contract returns 304 Not Modified, and other cache hits are
+    returned directly without going through the analysis path
+    """
+    start_time = time.perf_counter()
+    
+    etag = None
+    cache_key = None
+    if analysis_cache and not request.use_llm_audit:
+        # Cheap name check first so invalid names never reach the cache
+        is_valid, error_msg = validate_contract_name(request.contract_name)
+        if not is_valid:
+            raise HTTPException(status_code=400, detail=error_msg)
+        cache_key = analysis_cache.hash_key(request.contract_code, request.contract_name)
+        etag = _etag_for_key(cache_key)
+        cached_result = await analysis_cache.aget_by_hash(cache_key)
+        if cached_result is not None:
+            # Fast path: cached results were validated when stored, so skip
+            # re-validation and response-model serialization
+            if http_request.headers.get("if-none-match") == etag:
+                return Response(status_code=304, headers={"ETag": etag})
+            return DefaultJSONResponse(content=cached_result, headers={"ETag": etag})
+    
+    result = await _do_analyze(
+        request, start_time, cache_key, background_tasks, lookup_done=cache_key is not None
+    )
+    
+    if etag is not None:
+        response.headers["ETag"] = etag
+    return result
+
+
+def _utf8_size(text: str) -> int:
+    """UTF-8 encoded size in bytes (no encode needed for ASCII text)"""
+    return len(text) if text.isascii() else len(text.encode('utf-8'))
+
+
 @app.post("/cross-validate", response_model=CrossValidateResponse)
 async def cross_validate(request: CrossValidateRequest):
     """
     Run static/LLM analysis plus optional Slither/Mythril (if installed).
     """
-    start_time = time.time()
-    if not request.contract_code or not request.contract_code.strip():
+    start_time = time.perf_counter()
+    if not request.contract_code or request.contract_code.isspace():
         raise HTTPException(status_code=400, detail="Contract code cannot be empty")
-    if len(request.contract_code) > config.max_file_size_mb * 1024 * 1024:
+    if _utf8_size(request.contract_code) > MAX_FILE_SIZE_BYTES:
         raise HTTPException(
             status_code=413,
             detail=f"Contract code too large (max {config.max_file_size_mb}MB)"
@@ -560,7 +824,7 @@ async def cross_validate(request: CrossValidateRequest):
 
 
 @app.post("/analyze-batch")
-async def analyze_batch(contracts: list[ContractAnalysisRequest]):
+async def analyze_batch(contracts: list[ContractAnalysisRequest], background_tasks: BackgroundTasks):
     """
     Batch analysis endpoint
     Analyze multiple contracts at once
@@ -577,51 +841,74 @@ async def analyze_batch(contracts: list[ContractAnalysisRequest]):
             detail="Batch size limited to 10 contracts"
         )
     
-    results = []
-    for contract in contracts:
-        try:
-            # Recursively call analyze endpoint
-            result = await analyze_contract(contract)
-            results.append(result)
-        except Exception as e:
-            results.append({
-                "contract_name": contract.contract_name,
-                "error": str(e)
-            })
+    # Analyze concurrently, capping in-flight analyses (and LLM calls)
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    
+    async def _analyze_one(contract: ContractAnalysisRequest):
+        async with semaphore:
+            try:
+                return await _do_analyze(contract, time.perf_counter(), background_tasks=background_tasks)
+            except Exception as e:
+                return {
+                    "contract_name": contract.contract_name,
+                    "error": str(e)
+                }
     
-    return results
+    return await asyncio.gather(*(_analyze_one(contract) for contract in contracts))
 
 
 @app.post("/upload-and-analyze")
-async def upload_and_analyze(file: UploadFile = File(...)):
+async def upload_and_analyze(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
     """
     Upload contract file and analyze
     Accepts .sol files
     """
-    if not file.filename.endswith('.sol'):
+    if not file.filename or not file.filename.lower().endswith(_SOL_SUFFIX):
         raise HTTPException(
             status_code=400,
             detail="File must be a .sol Solidity contract"
         )
     
     try:
-        content = await file.read()
-        contract_code = content.decode('utf-8')
+        # Stream and decode chunk by chunk, failing fast on oversized files
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        parts = []
+        total = 0
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            total += len(chunk)
+            if total > MAX_FILE_SIZE_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File too large (max {config.max_file_size_mb}MB)"
+                )
+            parts.append(decoder.decode(chunk))
+        parts.append(decoder.decode(b'', final=True))
+        contract_code = ''.join(parts)
         
         request = ContractAnalysisRequest(
             contract_code=contract_code,
-            contract_name=file.filename.replace('.sol', '')
+            contract_name=file.filename[:-len(_SOL_SUFFIX)]
         )
         
-        return await analyze_contract(request)
+        return await _do_analyze(request, time.perf_counter(), background_tasks=background_tasks)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"File processing error: {str(e)}")
 
 
 @app.get("/tools/status")
-async def get_tools_status():
-    """Check status of external tools (Slither, Mythril)"""
+async def get_tools_status(refresh: bool = False):
+    """
+    Check status of external tools (Slither, Mythril)
+    Results are cached for a few minutes; pass refresh=true to re-check
+    (e.g. after installing a tool while the server is running)
+    """
+    if refresh:
+        check_slither_installed.cache_clear()
+        check_mythril_installed.cache_clear()
+    
     slither_ok, slither_msg = check_slither_installed()
     mythril_ok, mythril_msg = check_mythril_installed()
     
@@ -637,29 +924,33 @@ async def get_tools_status():
     }
 
 
+VULNERABILITY_DESCRIPTIONS = {
+    "reentrancy": "Reentrancy attacks allow a malicious contract to repeatedly call a function before the first execution is completed",
+    "unchecked_call": "Low-level calls (send, call) may fail silently if return value is not checked",
+    "overflow_underflow": "Integer arithmetic without SafeMath can overflow or underflow, causing unexpected behavior",
+    "access_control": "Missing access control modifiers allow unauthorized calls to sensitive functions",
+    "bad_randomness": "Using blockchain properties for randomness is predictable and exploitable",
+    "tx_origin": "Using tx.origin for authorization is vulnerable to phishing attacks through contract intermediaries",
+    "delegatecall": "Unsafe delegatecall to attacker-controlled addresses can lead to complete contract takeover",
+    "gas_dos": "Unbounded loops or expensive operations can cause Out-of-Gas exceptions (Denial of Service)",
+    "timestamp": "Relying on block.timestamp for critical logic is unreliable due to miner influence",
+    "selfdestruct": "Selfdestruct can destroy contracts unexpectedly, freezing funds"
+}
+
+# Static payload, serialized once at import
+_VULNERABILITIES_PAYLOAD = _json_bytes({
+    "vulnerabilities": VULNERABILITY_DESCRIPTIONS,
+    "total": len(VULNERABILITY_DESCRIPTIONS)
+})
+
+
 @app.get("/vulnerabilities")
 async def get_vulnerability_definitions():
     """
     Get definitions of all vulnerability types
     Useful for understanding what scanner detects
     """
-    vuln_descriptions = {
-        "reentrancy": "Reentrancy attacks allow a malicious contract to repeatedly call a function before the first execution is completed",
-        "unchecked_call": "Low-level calls (send, call) may fail silently if return value is not checked",
-        "overflow_underflow": "Integer arithmetic without SafeMath can overflow or underflow, causing unexpected behavior",
-        "access_control": "Missing access control modifiers allow unauthorized calls to sensitive functions",
-        "bad_randomness": "Using blockchain properties for randomness is predictable and exploitable",
-        "tx_origin": "Using tx.origin for authorization is vulnerable to phishing attacks through contract intermediaries",
-        "delegatecall": "Unsafe delegatecall to attacker-controlled addresses can lead to complete contract takeover",
-        "gas_dos": "Unbounded loops or expensive operations can cause Out-of-Gas exceptions (Denial of Service)",
-        "timestamp": "Relying on block.timestamp for critical logic is unreliable due to miner influence",
-        "selfdestruct": "Selfdestruct can destroy contracts unexpectedly, freezing funds"
-    }
-    
-    return {
-        "vulnerabilities": vuln_descriptions,
-        "total": len(vuln_descriptions)
-    }
+    return Response(content=_VULNERABILITIES_PAYLOAD, media_type="application/json")
 
 
 @app.post("/analyze-sarif")
@@ -667,14 +958,14 @@ async def analyze_contract_sarif(request: ContractAnalysisRequest):
     """
     Analyze contract and return SARIF format (for GitHub Code Scanning)
     """
-    start_time = time.time()
-    if not request.contract_code or not request.contract_code.strip():
+    start_time = time.perf_counter()
+    if not request.contract_code or request.contract_code.isspace():
         raise HTTPException(status_code=400, detail="Contract code cannot be empty")
     
     try:
-        result = await _analyze_static_and_llm(request, start_time)
-        sarif = generate_sarif_report(result.dict() if hasattr(result, 'dict') else result)
-        return JSONResponse(content=sarif, media_type="application/sarif+json")
+        result_dict = await _analyze_to_dict(request, start_time)
+        sarif = generate_sarif_report(result_dict)
+        return Response(content=_json_bytes(sarif), media_type="application/sarif+json")
     except HTTPException:
         raise
     except Exception as e:
@@ -693,10 +984,9 @@ async def analyze_contract_pdf(request: ContractAnalysisRequest):
     
     from fastapi.responses import Response
     
-    start_time = time.time()
+    start_time = time.perf_counter()
     try:
-        result = await _analyze_static_and_llm(request, start_time)
-        result_dict = result.dict() if hasattr(result, 'dict') else result
+        result_dict = await _analyze_to_dict(request, start_time)
         pdf_bytes = generate_pdf_report_bytes(result_dict)
         return Response(
             content=pdf_bytes,
@@ -765,19 +1055,18 @@ async def professional_audit(request: ProfessionalAuditRequest):
             detail="Professional audit features not available. Check dependencies."
         )
     
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     try:
-        # Input validation
-        is_valid, error_msg = validate_contract_code(request.contract_code)
+        # Validate and sanitize input
+        sanitized_code, is_valid, error_msg = validate_and_sanitize(
+            request.contract_code,
+            request.contract_name
+        )
         if not is_valid:
             raise HTTPException(status_code=400, detail=error_msg)
         
-        # Sanitize input
-        sanitized_code = sanitize_contract_code(request.contract_code)
-        
         # Perform professional audit
-        professional_auditor = ProfessionalAuditor()
         audit_result = professional_auditor.audit(sanitized_code, request.contract_name)
         
         # Generate report based on format
@@ -800,7 +1089,7 @@ async def professional_audit(request: ProfessionalAuditRequest):
             html_content = generate_professional_audit_report_html(audit_result)
             return HTMLResponse(content=html_content)
         else:  # json (default)
-            return JSONResponse(content=audit_result.to_dict())
+            return DefaultJSONResponse(content=audit_result.to_dict())
             
     except HTTPException:
         raise
@@ -809,60 +1098,92 @@ async def professional_audit(request: ProfessionalAuditRequest):
         raise HTTPException(status_code=500, detail=f"Professional audit failed: {str(e)}")
 
 
-@app.get("/swc-registry")
-async def get_swc_registry():
-    """Get SWC (Smart Contract Weakness Classification) registry"""
+def _build_swc_registry_payload() -> bytes:
+    """Serialize the (static) SWC registry response once"""
     from swc_registry import SWC_REGISTRY, get_all_swc_ids
-    return {
+    return _json_bytes({
         "swc_registry": SWC_REGISTRY,
         "supported_swc_ids": get_all_swc_ids(),
         "total_swc_issues_detected": len(SWC_REGISTRY)
-    }
+    })
 
 
-@app.get("/", response_class=HTMLResponse)
-async def root():
-    """Homepage - Serve explanatory HTML page"""
+_SWC_REGISTRY_PAYLOAD = _build_swc_registry_payload()
+
+
+@app.get("/swc-registry")
+async def get_swc_registry():
+    """Get SWC (Smart Contract Weakness Classification) registry"""
+    return Response(content=_SWC_REGISTRY_PAYLOAD, media_type="application/json")
+
+
+def _load_index_html() -> Optional[bytes]:
+    """Read the static homepage once, or None if it is missing/unreadable"""
+    index_path = Path(__file__).parent / "static" / "index.html"
     try:
-        # Try to serve the static homepage
-        index_path = Path(__file__).parent / "static" / "index.html"
         if index_path.exists():
-            html_content = index_path.read_text(encoding='utf-8')
-            return HTMLResponse(content=html_content)
+            return index_path.read_bytes()
     except Exception as e:
-        app_logger.warning(f"Could not serve static homepage: {e}")
+        app_logger.warning(f"Could not load static homepage: {e}")
+    return None
+
+
+_INDEX_HTML = _load_index_html()
+
+# JSON served from / when the static homepage is absent, serialized once
+_ROOT_FALLBACK_PAYLOAD = _json_bytes({
+    "name": "Solidity Vuln Scanner API",
+    "version": "1.0.0",
+    "message": "Welcome! Visit /docs for API documentation or http://localhost:8501 for the Web UI",
+    "api_versions": ["v1"],
+    "endpoints": {
+        "homepage": "/",
+        "docs": "/docs",
+        "web_ui": "http://localhost:8501",
+        "health": "/health",
+        "analyze": "POST /analyze",
+        "analyze-sarif": "POST /analyze-sarif",
+        "analyze-pdf": "POST /analyze-pdf",
+        "batch": "POST /analyze-batch",
+        "upload": "POST /upload-and-analyze",
+        "vulnerabilities": "GET /vulnerabilities",
+        "webhooks": "POST /webhooks/register",
+        "v1": "/v1/* (versioned API)"
+    },
+    "docs": "Visit /docs for interactive API documentation"
+})
+
+
+@app.get("/", response_class=HTMLResponse)
+async def root():
+    """Homepage - Serve explanatory HTML page"""
+    if _INDEX_HTML is not None:
+        return HTMLResponse(content=_INDEX_HTML)
     
     # Fallback to JSON response
-    return JSONResponse({
-        "name": "Solidity Vuln Scanner API",
-        "version": "1.0.0",
-        "message": "Welcome! Visit /docs for API documentation or http://localhost:8501 for the Web UI",
-        "api_versions": ["v1"],
-        "endpoints": {
-            "homepage": "/",
-            "docs": "/docs",
-            "web_ui": "http://localhost:8501",
-            "health": "/health",
-            "analyze": "POST /analyze",
-            "analyze-sarif": "POST /analyze-sarif",
-            "analyze-pdf": "POST /analyze-pdf",
-            "batch": "POST /analyze-batch",
-            "upload": "POST /upload-and-analyze",
-            "vulnerabilities": "GET /vulnerabilities",
-            "webhooks": "POST /webhooks/register",
-            "v1": "/v1/* (versioned API)"
-        },
-        "docs": "Visit /docs for interactive API documentation"
-    })
+    return Response(content=_ROOT_FALLBACK_PAYLOAD, media_type="application/json")
 
 
 def main():
     """Run the API server"""
+    # Auto-size workers (2 x CPU + 1) unless API_WORKERS is set; reload
+    # mode only supports a single worker
+    if config.debug:
+        workers = 1
+    else:
+        workers = config.api_workers or (os.cpu_count() or 1) * 2 + 1
+    
+    # uvloop/httptools ship with uvicorn[standard] but not on every platform
     uvicorn.run(
-        app,
+        "fastapi_api:app",  # Import string (not app object) so workers > 1 works
         host=config.api_host,
         port=config.api_port,
-        reload=config.debug
+        reload=config.debug,
+        workers=workers,
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "auto",
+        http="httptools" if importlib.util.find_spec("httptools") else "auto",
+        limit_concurrency=config.api_limit_concurrency or None,  # 503 beyond this
+        timeout_keep_alive=5
     )
 
 
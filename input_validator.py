@@ -2,7 +2,6 @@
 Input validation and sanitization for contract code
 """
 
-import re
 import unicodedata
 from pathlib import Path
 from typing import Tuple, Optional
@@ -12,6 +11,75 @@ from exceptions import ValidationError
 
 logger = get_logger(__name__)
 config = get_config()
+MAX_CONTRACT_SIZE_CHARS = config.max_contract_size_chars
+
+# Basic Solidity detection (pragma or contract keyword), matched as plain
+# substrings of the lowercased source instead of an IGNORECASE regex
+_SOLIDITY_KEYWORDS = ('pragma solidity', 'contract ')
+
+# Leading slice searched for the Solidity keywords before the full source
+_SOLIDITY_PREFIX_CHARS = 4096
+
+# Lines longer than this are rejected (regex DoS guard)
+MAX_LINE_LENGTH = 10000
+
+
+# ASCII control characters (everything below 0x20 except tab/newline/CR,
+# plus DEL) deleted in C via str.translate
+_CTRL_TRANSLATE = dict.fromkeys(
+    [i for i in range(32) if chr(i) not in '\n\t\r'] + [0x7f]
+)
+
+# Characters stripped from filenames: all ASCII controls, path separators
+# and shell/Windows-reserved punctuation
+_FILENAME_TRANSLATE = dict.fromkeys(
+    list(range(32)) + [0x7f] + [ord(c) for c in '/\\<>:"|?*']
+)
+
+
+def _looks_like_solidity(contract_code: str) -> bool:
+    """
+    Cheap check for a Solidity keyword (case-insensitive substring scan)
+    
+    The keywords normally appear near the top, so only the head is
+    lowercased and searched; the whole source is only lowercased when
+    the head doesn't contain them.
+    """
+    head = contract_code[:_SOLIDITY_PREFIX_CHARS].lower()
+    if any(keyword in head for keyword in _SOLIDITY_KEYWORDS):
+        return True
+    if len(contract_code) <= _SOLIDITY_PREFIX_CHARS:
+        return False
+    lowered = contract_code.lower()
+    return any(keyword in lowered for keyword in _SOLIDITY_KEYWORDS)
+
+
+def _find_long_line(text: str, max_length: int = MAX_LINE_LENGTH) -> int:
+    """
+    Find the first line longer than max_length without splitting the text
+    
+    Looks for the last newline in each window of max_length + 1 characters
+    starting at a line start; a window with no newline is an over-long
+    line, otherwise scanning resumes after that newline. Short lines are
+    skipped many at a time, so this is ~len(text) / max_length C-level
+    searches and allocates nothing.
+    
+    Returns:
+        Offset where the over-long line starts, or -1 if there is none
+    """
+    size = len(text)
+    pos = 0
+    while pos + max_length < size:
+        newline = text.rfind('\n', pos, pos + max_length + 1)
+        if newline == -1:
+            return pos
+        pos = newline + 1
+    return -1
+
+
+def _is_removable_unicode(c: str) -> bool:
+    """True for Unicode control/format/unassigned characters other than whitespace"""
+    return unicodedata.category(c)[0] == 'C' and c not in '\n\t\r'
 
 
 def validate_contract_code(contract_code: str) -> Tuple[bool, Optional[str]]:
@@ -24,30 +92,35 @@ def validate_contract_code(contract_code: str) -> Tuple[bool, Optional[str]]:
     Returns:
         Tuple of (is_valid, error_message)
     """
-    if not contract_code or not contract_code.strip():
+    # Cheapest rejects first: emptiness, size, null bytes (all C-level
+    # scans without copying), then the line scan, then the keyword check
+    if not contract_code or contract_code.isspace():
         return False, "Contract code cannot be empty"
     
     # Check size limits
     code_size = len(contract_code)
-    max_size = config.max_contract_size_chars
-    
-    if code_size > max_size:
-        return False, f"Contract code too large ({code_size} chars, max {max_size})"
-    
-    # Check for potentially malicious patterns (basic sanitization)
-    # Prevent regex DoS attacks by checking for extremely long lines
-    lines = contract_code.split('\n')
-    for i, line in enumerate(lines, 1):
-        if len(line) > 10000:  # Very long line could be regex DoS
-            logger.warning(f"Line {i} is extremely long ({len(line)} chars), may cause performance issues")
-            return False, f"Line {i} is too long (potential DoS risk)"
+    if code_size > MAX_CONTRACT_SIZE_CHARS:
+        return False, f"Contract code too large ({code_size} chars, max {MAX_CONTRACT_SIZE_CHARS})"
     
     # Check for null bytes (could cause issues)
     if '\x00' in contract_code:
         return False, "Contract code contains null bytes"
     
+    # Check for potentially malicious patterns (basic sanitization)
+    # Prevent regex DoS attacks by checking for extremely long lines
+    start = _find_long_line(contract_code)
+    if start != -1:  # Very long line could be regex DoS
+        line_no = contract_code.count('\n', 0, start) + 1
+        end = contract_code.find('\n', start)
+        line_length = (end if end != -1 else code_size) - start
+        logger.warning(
+            "Line %d is extremely long (%d chars), may cause performance issues",
+            line_no, line_length
+        )
+        return False, f"Line {line_no} is too long (potential DoS risk)"
+    
     # Basic Solidity validation (must contain pragma or contract keyword)
-    if not re.search(r'(pragma\s+solidity|contract\s+\w+)', contract_code, re.IGNORECASE):
+    if not _looks_like_solidity(contract_code):
         logger.warning("Contract code doesn't appear to be valid Solidity")
         # Don't reject, just warn - might be partial code
     
@@ -62,26 +135,32 @@ def sanitize_contract_code(contract_code: str) -> str:
         contract_code: Raw contract code
         
     Returns:
-        Sanitized contract code
+        Sanitized contract code; the input object itself when nothing
+        needed changing, so clean sources are never copied
     """
-    # Remove null bytes
-    sanitized = contract_code.replace('\x00', '')
-    
-    # Normalize Unicode (prevent homograph attacks and normalize variants)
-    try:
-        sanitized = unicodedata.normalize('NFKC', sanitized)
-    except Exception as e:
-        logger.warning(f"Unicode normalization failed: {e}")
-    
-    # Remove control characters except newline, tab, and carriage return
-    # This prevents hidden control chars that could cause issues
-    sanitized = ''.join(
-        c for c in sanitized 
-        if unicodedata.category(c)[0] != 'C' or c in '\n\t\r'
-    )
-    
-    # Normalize line endings
-    sanitized = sanitized.replace('\r\n', '\n').replace('\r', '\n')
+    # Remove ASCII control characters (null bytes included); the table only
+    # deletes, so an unchanged length means nothing was removed and the
+    # original object can be kept
+    sanitized = contract_code.translate(_CTRL_TRANSLATE)
+    if len(sanitized) == len(contract_code):
+        sanitized = contract_code
+    
+    # Normalize line endings; most sources are \n-only, so one memchr scan
+    # for \r skips both replace passes
+    if '\r' in sanitized:
+        sanitized = sanitized.replace('\r\n', '\n').replace('\r', '\n')
+    
+    # Non-ASCII input needs Unicode normalization (prevent homograph attacks
+    # and normalize variants) and removal of non-ASCII control characters
+    if not sanitized.isascii():
+        try:
+            sanitized = unicodedata.normalize('NFKC', sanitized)
+        except Exception as e:
+            logger.warning(f"Unicode normalization failed: {e}")
+        
+        # Only rebuild the string when something actually has to go
+        if any(_is_removable_unicode(c) for c in sanitized):
+            sanitized = ''.join(c for c in sanitized if not _is_removable_unicode(c))
     
     return sanitized
 
@@ -96,18 +175,16 @@ def sanitize_filename(filename: str) -> str:
     Returns:
         Sanitized filename safe for use in file operations
     """
-    # Get just the basename (no directory traversal)
-    safe_name = Path(filename).name
-    
-    # Remove any remaining path separators
-    safe_name = safe_name.replace('/', '').replace('\\', '')
+    # Get just the basename (no directory traversal), then drop remaining
+    # separators, ASCII controls and dangerous characters in one pass
+    safe_name = Path(filename).name.translate(_FILENAME_TRANSLATE)
     
-    # Remove control characters and dangerous characters
-    safe_name = ''.join(c for c in safe_name if c.isprintable() and c not in '<>:"|?*')
+    # Non-ASCII names may still carry non-printable code points
+    if not safe_name.isascii() and not safe_name.isprintable():
+        safe_name = ''.join(c for c in safe_name if c.isprintable())
     
     # Limit length
-    if len(safe_name) > 255:
-        safe_name = safe_name[:255]
+    safe_name = safe_name[:255]
     
     # Ensure it's not empty or just dots
     if not safe_name or safe_name in ('.', '..'):
@@ -126,14 +203,44 @@ def validate_contract_name(contract_name: str) -> Tuple[bool, Optional[str]]:
     Returns:
         Tuple of (is_valid, error_message)
     """
-    if not contract_name or not contract_name.strip():
+    if not contract_name or contract_name.isspace():
         return False, "Contract name cannot be empty"
     
     if len(contract_name) > 255:
         return False, "Contract name too long (max 255 characters)"
     
-    # Check for valid identifier characters
-    if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', contract_name):
+    # Check for valid identifier characters: for ASCII strings
+    # isidentifier() is exactly [a-zA-Z_][a-zA-Z0-9_]*
+    if not (contract_name.isascii() and contract_name.isidentifier()):
         return False, "Contract name contains invalid characters"
     
     return True, None
+
+
+def validate_and_sanitize(
+    contract_code: str,
+    contract_name: str = "Contract"
+) -> Tuple[Optional[str], bool, Optional[str]]:
+    """
+    Validate contract code and name, then sanitize the code
+    
+    Replaces separate validate_contract_code / validate_contract_name /
+    sanitize_contract_code calls on the request path.
+    
+    Args:
+        contract_code: Raw contract code
+        contract_name: Contract name string
+        
+    Returns:
+        Tuple of (sanitized_code, is_valid, error_message); sanitized_code
+        is None when validation fails
+    """
+    is_valid, error_msg = validate_contract_code(contract_code)
+    if not is_valid:
+        return None, False, error_msg
+    
+    is_valid, error_msg = validate_contract_name(contract_name)
+    if not is_valid:
+        return None, False, error_msg
+    
+    return sanitize_contract_code(contract_code), True, None
@@ -5,34 +5,252 @@ Supports both sync and async operations
 """
 
 import json
+import re
 import os
 import asyncio
-from typing import Optional, Dict, List
+import hashlib
+import importlib.util
+import threading
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Optional, Dict, List, Tuple
 import time
 from dataclasses import dataclass
 from app_config import get_config
 from logger_config import get_logger
 from exceptions import LLMAuditException
 
-# Retry logic
+# Retry logic; tenacity is imported on first use (see _call_with_retry) so
+# workers that never call an LLM don't pay for it at import
+RETRY_AVAILABLE = importlib.util.find_spec("tenacity") is not None
+
+# Optional token counting for accurate prompt truncation
 try:
-    from tenacity import (
-        retry,
-        stop_after_attempt,
-        wait_exponential,
-        retry_if_exception_type
-    )
-    RETRY_AVAILABLE = True
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
 except ImportError:
-    RETRY_AVAILABLE = False
+    TIKTOKEN_AVAILABLE = False
+
+# Optional faster JSON parsing of model responses
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
 
 logger = get_logger(__name__)
 config = get_config()
 
+TRUNCATION_MARKER = "\n... [truncated - contract too large for full analysis]"
+
+# System messages for the JSON-mode audit and the plain-text fallback
+_SYSTEM_PROMPT = "You are an expert Solidity security auditor. Analyze smart contracts for vulnerabilities, logic flaws, and best practice violations. Return a valid JSON response."
+_FALLBACK_SYSTEM_PROMPT = "You are a Solidity security expert. Provide practical security advice."
+
+# Prompt templates, filled with str.format (literal braces are doubled)
+_AUDIT_PROMPT_TEMPLATE = """Analyze this Solidity smart contract "{name}" for security vulnerabilities:
+
+```solidity
+{code}{marker}
+```
+
+Provide a security audit in JSON format with these fields:
+{{
+    "summary": "Brief overview of contract security posture",
+    "recommendations": ["List of actionable recommendations"],
+    "logic_vulnerabilities": ["Logic-level vulnerabilities not caught by static analysis"],
+    "best_practices": ["Best practices this contract should follow"],
+    "risk_assessment": "CRITICAL|HIGH|MEDIUM|LOW|INFO"
+}}
+
+Focus on:
+- Reentrancy and state management
+- Access control and authorization
+- Arithmetic operations and overflow/underflow
+- External calls and dependencies
+- Business logic flaws
+- Gas optimization issues
+- Compliance with DASP TOP 10
+
+Be specific with line references where possible."""
+
+_FALLBACK_PROMPT_TEMPLATE = """Analyze this Solidity contract for security issues:
+
+{code}{marker}
+
+Provide a brief security assessment covering:
+1. Critical vulnerabilities
+2. Recommendations
+3. Risk level (LOW/MEDIUM/HIGH/CRITICAL)"""
+
+# Several small contracts in one request; each is preceded by a
+# "---CONTRACT <index>: <name>---" delimiter line
+_PACKED_PROMPT_TEMPLATE = """Analyze each of the following Solidity smart contracts for security vulnerabilities:
+{contracts}
+
+Return a JSON object with one audit per contract, matched by its index:
+{{
+    "results": [
+        {{
+            "index": 0,
+            "summary": "Brief overview of contract security posture",
+            "recommendations": ["List of actionable recommendations"],
+            "logic_vulnerabilities": ["Logic-level vulnerabilities not caught by static analysis"],
+            "best_practices": ["Best practices this contract should follow"],
+            "risk_assessment": "CRITICAL|HIGH|MEDIUM|LOW|INFO"
+        }}
+    ]
+}}
+
+Focus on reentrancy, access control, arithmetic, external calls, business
+logic flaws and compliance with DASP TOP 10."""
+
+# Connection pool shared by all requests of one provider client; keep-alive
+# connections let concurrent audits skip repeated TCP/TLS handshakes
+LLM_HTTP_MAX_CONNECTIONS = 100
+LLM_HTTP_MAX_KEEPALIVE = 20
+
+# HTTP/2 multiplexing needs the optional h2 package (httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _http_timeout():
+    """Per-request timeout for provider clients (LLM_REQUEST_TIMEOUT)"""
+    import httpx
+    return httpx.Timeout(config.llm_request_timeout, connect=10.0)
+
+
+def _http_limits():
+    """httpx pool limits for provider clients (httpx ships with the SDKs)"""
+    import httpx
+    return httpx.Limits(
+        max_connections=LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE
+    )
+
+
+# Top-level declarations that mark real Solidity; input (comments stripped)
+# without any of them is answered without calling the model
+_SOLIDITY_DECLARATION_PATTERN = re.compile(r'\b(?:contract|library|interface)\s+\w+')
+
+# String literals (kept verbatim so "//" inside them survives), line and
+# block comments with the spaces before them, and whitespace at line edges
+_SOLIDITY_MINIFY_PATTERN = re.compile(
+    r'("(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\')'
+    r'|[ \t]*//[^\n]*'
+    r'|[ \t]*/\*.*?\*/'
+    r'|^[ \t]+|[ \t]+$',
+    re.DOTALL | re.MULTILINE
+)
+
+
+def _minify_replacement(match) -> str:
+    if match.group(1) is not None:
+        return match.group(1)
+    # Keep the newlines of block comments so line numbers stay valid
+    return '\n' * match.group(0).count('\n')
+
+
+def _minify_solidity(contract_code: str) -> str:
+    """
+    Strip comments and indentation from Solidity source for the LLM prompt
+    
+    Line breaks are preserved so line references in the audit still match
+    the submitted source; only tokens that carry no code are dropped.
+    """
+    return _SOLIDITY_MINIFY_PATTERN.sub(_minify_replacement, contract_code)
+
+
+# Attempts per async API call for transient failures (on top of the SDKs'
+# own connection-level retries)
+LLM_MAX_ATTEMPTS = 3
+
 
-@dataclass
+def _is_retryable(exc: BaseException) -> bool:
+    """Timeouts, connection errors, 408/409/429 and 5xx are worth retrying"""
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    if type(exc).__name__ in ("APIConnectionError", "APITimeoutError"):
+        return True
+    status = getattr(exc, "status_code", None)
+    return status in (408, 409, 429) or (isinstance(status, int) and status >= 500)
+
+
+def _log_retry(retry_state):
+    logger.warning(
+        "LLM API call failed (attempt %d/%d): %s, retrying",
+        retry_state.attempt_number, LLM_MAX_ATTEMPTS, retry_state.outcome.exception()
+    )
+
+
+async def _call_with_retry(call):
+    """
+    Await call(), retrying transient failures with jittered backoff
+    
+    Jitter keeps concurrent audits from retrying in lockstep after a
+    shared rate-limit or outage. Without tenacity the call runs once.
+    """
+    if not RETRY_AVAILABLE:
+        return await call()
+    from tenacity import (
+        AsyncRetrying,
+        stop_after_attempt,
+        wait_exponential_jitter,
+        retry_if_exception
+    )
+    async for attempt in AsyncRetrying(
+        stop=stop_after_attempt(LLM_MAX_ATTEMPTS),
+        wait=wait_exponential_jitter(initial=1, max=8),
+        retry=retry_if_exception(_is_retryable),
+        before_sleep=_log_retry,
+        reraise=True
+    ):
+        with attempt:
+            return await call()
+
+
+class _TokenBucket:
+    """
+    Async token bucket refilled continuously at a per-minute rate
+    
+    Used to stay under provider RPM/TPM limits up front instead of
+    discovering them through 429 responses and backoff sleeps. Only used
+    from the event loop thread, so no lock is needed.
+    """
+    
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+    
+    async def acquire(self, amount: float = 1):
+        """Wait until `amount` tokens are available, then take them"""
+        amount = min(amount, self.capacity)
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+@lru_cache(maxsize=None)
+def _get_token_encoder(model: str):
+    """tiktoken encoder for a model (BPE tables load once per model)"""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+@dataclass(slots=True)
 class LLMAuditResult:
-    """Result of LLM-based audit"""
+    """Result of LLM-based audit (slotted: the result cache may hold many)"""
     summary: str
     recommendations: List[str]
     logic_vulnerabilities: List[str]
@@ -69,20 +287,35 @@ class LLMAuditor:
         self.api_key = api_key or os.getenv("LLM_API_KEY")
         self.model = model
         self.provider = provider
+        self.supports_async = False
+        self._async_client = None
+        # Identical contracts (batch re-runs, CI, webhook redelivery) reuse
+        # the previous audit instead of paying for another API call
+        self._result_cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._inflight: Dict[bytes, asyncio.Future] = {}
+        # Proactive throttling of async API calls (0 disables a limit)
+        self._rpm_bucket = _TokenBucket(config.llm_requests_per_minute) if config.llm_requests_per_minute > 0 else None
+        self._tpm_bucket = _TokenBucket(config.llm_tokens_per_minute) if config.llm_tokens_per_minute > 0 else None
+        self._semaphore: Optional[asyncio.Semaphore] = None
         
         if not self.api_key:
             raise ValueError("LLM_API_KEY environment variable not set")
         
         if provider == "openai":
             try:
+                import httpx
                 import openai
-                # Initialize OpenAI client with only api_key to avoid version conflicts
-                self.client = openai.OpenAI(api_key=self.api_key)
-                # Also create async client
-                try:
-                    self.async_client = openai.AsyncOpenAI(api_key=self.api_key)
-                except Exception:
-                    self.async_client = None
+                # Pass our own pooled httpx client; the sync client is shared
+                # by audits running in executor threads
+                self.client = openai.OpenAI(
+                    api_key=self.api_key,
+                    timeout=_http_timeout(),
+                    http_client=httpx.Client(limits=_http_limits(), timeout=_http_timeout())
+                )
+                # Async client is created lazily on first async audit
+                self.supports_async = hasattr(openai, "AsyncOpenAI")
+                if not self.supports_async:
                     logger.warning("Async OpenAI client not available")
             except TypeError as e:
                 # Handle version compatibility issues gracefully
@@ -93,13 +326,186 @@ class LLMAuditor:
                 raise ImportError("openai package not installed. Run: pip install openai")
         elif provider == "anthropic":
             try:
+                import httpx
                 import anthropic
-                self.client = anthropic.Anthropic(api_key=self.api_key)
-                self.async_client = None  # Anthropic async support can be added later
+                self.client = anthropic.Anthropic(
+                    api_key=self.api_key,
+                    timeout=_http_timeout(),
+                    http_client=httpx.Client(limits=_http_limits(), timeout=_http_timeout())
+                )
+                # Async client is created lazily on first async audit
+                self.supports_async = hasattr(anthropic, "AsyncAnthropic")
             except ImportError:
                 raise ImportError("anthropic package not installed. Run: pip install anthropic")
         
-        logger.info(f"LLM auditor initialized with provider: {provider}, model: {model}")
+        logger.info("LLM auditor initialized with provider: %s, model: %s", provider, model)
+    
+    def _get_async_client(self):
+        """
+        Get the async provider client, creating it on first use
+        
+        Keeps worker startup cheap when /analyze never runs an LLM audit.
+        Creation does not await, so concurrent coroutines cannot race here.
+        """
+        if self._async_client is None:
+            import httpx
+            http_client = httpx.AsyncClient(
+                limits=_http_limits(),
+                timeout=_http_timeout(),
+                http2=HTTP2_AVAILABLE
+            )
+            if self.provider == "anthropic":
+                import anthropic
+                self._async_client = anthropic.AsyncAnthropic(
+                    api_key=self.api_key,
+                    timeout=http_client.timeout,
+                    http_client=http_client
+                )
+            else:
+                import openai
+                self._async_client = openai.AsyncOpenAI(
+                    api_key=self.api_key,
+                    timeout=http_client.timeout,
+                    http_client=http_client
+                )
+        return self._async_client
+    
+    async def aclose(self):
+        """Close the async provider client and its connection pool"""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+    
+    @asynccontextmanager
+    async def _throttled(self, prompt: str, max_tokens: int):
+        """
+        Hold a concurrency slot and RPM/TPM budget for one API call
+        
+        The token cost is estimated as prompt chars / 4 plus the
+        completion limit, which errs on the side of staying under TPM.
+        """
+        if self._rpm_bucket is not None:
+            await self._rpm_bucket.acquire(1)
+        if self._tpm_bucket is not None:
+            await self._tpm_bucket.acquire(len(prompt) // 4 + max_tokens)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(max(1, config.llm_max_concurrency))
+        async with self._semaphore:
+            yield
+    
+    @staticmethod
+    def _unknown_result(summary: str) -> LLMAuditResult:
+        """Canned UNKNOWN-risk result for input that isn't worth an API call"""
+        return LLMAuditResult(
+            summary=summary,
+            recommendations=[],
+            logic_vulnerabilities=[],
+            best_practices=[],
+            risk_assessment="UNKNOWN"
+        )
+    
+    def _result_cache_key(self, contract_code: str, contract_name: str, truncated: bool = False) -> bytes:
+        """Cache key: SHA-256 over provider, model, name and (truncated) code"""
+        hasher = hashlib.sha256(
+            f"{self.provider}\x00{self.model}\x00{contract_name}\x00{int(truncated)}\x00".encode('utf-8')
+        )
+        hasher.update(contract_code.encode('utf-8'))
+        return hasher.digest()
+    
+    def _get_cached_result(self, key: bytes) -> Optional[LLMAuditResult]:
+        """Return a cached audit result if present and not expired"""
+        with self._cache_lock:
+            entry = self._result_cache.get(key)
+            if entry is None:
+                return None
+            cached_time, result = entry
+            if time.time() - cached_time < config.cache_ttl_seconds:
+                logger.info("LLM audit cache hit")
+                self._result_cache.move_to_end(key)
+                return result
+            del self._result_cache[key]
+        return None
+    
+    def _cache_result(self, key: bytes, result: LLMAuditResult):
+        """Store an audit result, evicting the least recently used when full"""
+        max_size = config.llm_cache_max_size
+        if max_size <= 0:
+            return
+        with self._cache_lock:
+            if key in self._result_cache:
+                self._result_cache.move_to_end(key)
+            elif len(self._result_cache) >= max_size:
+                self._result_cache.popitem(last=False)
+            self._result_cache[key] = (time.time(), result)
+    
+    def _truncate_contract(self, contract_code: str) -> Tuple[str, bool]:
+        """
+        Fit contract code into the LLM prompt budget
+        
+        For OpenAI models with tiktoken installed the budget is counted in
+        tokens (config.llm_max_contract_tokens), so the prompt is neither
+        over- nor under-filled; otherwise it falls back to the character
+        limit (config.llm_max_contract_size). Code that fits is returned
+        as-is without encoding or copying.
+        
+        Returns:
+            Tuple of (code, truncated). The truncation marker is not
+            appended here; the prompt templates embed it when truncated is
+            set, so the code is not copied a second time.
+        """
+        if self.provider == "openai" and TIKTOKEN_AVAILABLE:
+            max_tokens = config.llm_max_contract_tokens
+            # Every token covers at least one character
+            if len(contract_code) <= max_tokens:
+                return contract_code, False
+            encoder = _get_token_encoder(self.model)
+            tokens = encoder.encode(contract_code, disallowed_special=())
+            if len(tokens) <= max_tokens:
+                return contract_code, False
+            logger.warning(
+                "Contract code truncated from %d to %d tokens for LLM analysis",
+                len(tokens), max_tokens
+            )
+            return encoder.decode(tokens[:max_tokens]), True
+        
+        max_size = config.llm_max_contract_size
+        original_size = len(contract_code)
+        if original_size <= max_size:
+            return contract_code, False
+        logger.warning(
+            "Contract code truncated from %d to %d chars for LLM analysis",
+            original_size, max_size
+        )
+        return contract_code[:max_size], True
+    
+    def _prepare_contract(self, contract_code: str) -> Tuple[Optional[LLMAuditResult], str, bool]:
+        """
+        Check for trivial input, then minify (if enabled) and truncate code
+        for the prompt; see _truncate_contract
+        
+        The source is minified once, for both the declaration check and
+        the prompt.
+        
+        Returns:
+            (canned result, None otherwise; prompt code; truncated)
+        """
+        if not contract_code or contract_code.isspace():
+            return self._unknown_result("No contract code provided"), contract_code, False
+        
+        # Pragma-only files and plain-text pastes; comments don't count
+        minified = _minify_solidity(contract_code)
+        if _SOLIDITY_DECLARATION_PATTERN.search(minified) is None:
+            return self._unknown_result(
+                "No Solidity contract, library or interface declaration detected"
+            ), contract_code, False
+        
+        # Drop comments/indentation first so more code fits the budget
+        if config.llm_minify_contract:
+            contract_code = minified
+        
+        # Handle large contracts (use config limit, warn if truncated)
+        code, truncated = self._truncate_contract(contract_code)
+        return None, code, truncated
     
     def audit(self, contract_code: str, contract_name: str = "Contract") -> LLMAuditResult:
         """
@@ -112,32 +518,28 @@ class LLMAuditor:
         Returns:
             LLMAuditResult with audit findings
         """
-        if not contract_code.strip():
-            return LLMAuditResult(
-                summary="No contract code provided",
-                recommendations=[],
-                logic_vulnerabilities=[],
-                best_practices=[],
-                risk_assessment="UNKNOWN"
-            )
+        trivial, contract_code, truncated = self._prepare_contract(contract_code)
+        if trivial is not None:
+            return trivial
         
-        # Handle large contracts (use config limit, warn if truncated)
-        max_size = config.llm_max_contract_size
-        original_size = len(contract_code)
-        if original_size > max_size:
-            logger.warning(f"Contract code truncated from {original_size} to {max_size} chars for LLM analysis")
-            contract_code = contract_code[:max_size] + "\n... [truncated - contract too large for full analysis]"
+        cache_key = self._result_cache_key(contract_code, contract_name, truncated)
+        cached = self._get_cached_result(cache_key)
+        if cached is not None:
+            return cached
         
         try:
             if self.provider == "openai":
-                return self._audit_with_openai(contract_code, contract_name)
+                result = self._audit_with_openai(contract_code, contract_name, truncated)
             elif self.provider == "anthropic":
-                return self._audit_with_anthropic(contract_code, contract_name)
+                result = self._audit_with_anthropic(contract_code, contract_name, truncated)
             else:
                 raise ValueError(f"Unknown provider: {self.provider}")
         except Exception as e:
-            logger.error(f"LLM audit failed: {e}", exc_info=True)
+            logger.error("LLM audit failed: %s", e, exc_info=True)
             raise LLMAuditException(f"LLM audit failed: {str(e)}")
+        
+        self._cache_result(cache_key, result)
+        return result
     
     async def audit_async(self, contract_code: str, contract_name: str = "Contract") -> LLMAuditResult:
         """
@@ -150,43 +552,269 @@ class LLMAuditor:
         Returns:
             LLMAuditResult with audit findings
         """
-        if not contract_code.strip():
-            return LLMAuditResult(
-                summary="No contract code provided",
-                recommendations=[],
-                logic_vulnerabilities=[],
-                best_practices=[],
-                risk_assessment="UNKNOWN"
-            )
+        trivial, contract_code, truncated = self._prepare_contract(contract_code)
+        if trivial is not None:
+            return trivial
         
-        # Handle large contracts
-        max_size = config.llm_max_contract_size
-        original_size = len(contract_code)
-        if original_size > max_size:
-            logger.warning(f"Contract code truncated from {original_size} to {max_size} chars for LLM analysis")
-            contract_code = contract_code[:max_size] + "\n... [truncated - contract too large for full analysis]"
+        cache_key = self._result_cache_key(contract_code, contract_name, truncated)
+        cached = self._get_cached_result(cache_key)
+        if cached is not None:
+            return cached
         
+        # Concurrent audits of the same contract (duplicates within one
+        # batch, client retries) share a single in-flight API call
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._run_audit_async(contract_code, contract_name, truncated, cache_key)
+            )
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        # Shield so one cancelled caller does not cancel the shared call
+        return await asyncio.shield(task)
+    
+    async def _run_audit_async(
+        self, contract_code: str, contract_name: str, truncated: bool, cache_key: bytes
+    ) -> LLMAuditResult:
+        """Dispatch an async audit to the provider and cache the result"""
         try:
-            if self.provider == "openai" and self.async_client:
-                return await self._audit_with_openai_async(contract_code, contract_name)
+            if self.provider == "openai" and self.supports_async:
+                result = await self._audit_with_openai_async(contract_code, contract_name, truncated)
             elif self.provider == "openai":
                 # Fallback to sync if async client not available
                 logger.warning("Async client not available, using sync method")
-                return self.audit(contract_code, contract_name)
+                result = self._audit_with_openai(contract_code, contract_name, truncated)
+            elif self.provider == "anthropic" and self.supports_async:
+                result = await self._audit_with_anthropic_async(contract_code, contract_name, truncated)
             elif self.provider == "anthropic":
-                # Anthropic async can be added later
-                logger.warning("Async not yet supported for Anthropic, using sync method")
-                return self.audit(contract_code, contract_name)
+                # Fallback to sync if async client not available
+                logger.warning("Async client not available, using sync method")
+                result = self._audit_with_anthropic(contract_code, contract_name, truncated)
             else:
                 raise ValueError(f"Unknown provider: {self.provider}")
         except Exception as e:
-            logger.error(f"Async LLM audit failed: {e}", exc_info=True)
+            logger.error("Async LLM audit failed: %s", e, exc_info=True)
             raise LLMAuditException(f"LLM audit failed: {str(e)}")
+        
+        self._cache_result(cache_key, result)
+        return result
+    
+    async def audit_many(self, contracts: List[Tuple[str, str]]) -> List[LLMAuditResult]:
+        """
+        Audit several contracts, e.g. for CI or repository-wide scans
+        
+        With LLM_USE_BATCH_API enabled and an OpenAI SDK that provides the
+        Batch API, uncached contracts are submitted as one batch job (half
+        the per-token price, results within the 24h completion window).
+        Otherwise the audits run concurrently through audit_async.
+        
+        Args:
+            contracts: List of (contract_code, contract_name) pairs
+            
+        Returns:
+            LLMAuditResult per contract, in input order
+        """
+        if config.llm_use_batch_api and self.provider == "openai" and self.supports_async:
+            if hasattr(self._get_async_client(), "batches"):
+                return await self._audit_many_openai_batch(contracts)
+            logger.warning("Installed openai SDK has no Batch API, auditing concurrently")
+        
+        return list(await asyncio.gather(
+            *(self.audit_async(code, name) for code, name in contracts)
+        ))
     
-    def _audit_with_openai(self, contract_code: str, contract_name: str) -> LLMAuditResult:
+    async def audit_many_concatenated(self, contracts: List[Tuple[str, str]]) -> List[LLMAuditResult]:
+        """
+        Audit many small contracts with several contracts per API request
+        
+        Uncached contracts are packed, up to config.llm_pack_max_contracts
+        at a time and within the llm_max_contract_size budget, into one
+        JSON-mode prompt, so a scan of many small files costs far fewer
+        requests against the RPM limit. Contracts that need truncation,
+        answers missing from a packed response, and providers other than
+        OpenAI fall back to individual audit_async calls.
+        
+        Args:
+            contracts: List of (contract_code, contract_name) pairs
+            
+        Returns:
+            LLMAuditResult per contract, in input order
+        """
+        if self.provider != "openai" or not self.supports_async or config.llm_pack_max_contracts < 2:
+            return await self.audit_many(contracts)
+        
+        results: List[Optional[LLMAuditResult]] = [None] * len(contracts)
+        packs: List[List[Tuple[int, str, str, bytes]]] = []
+        pack_size = 0
+        single = []
+        
+        for index, (contract_code, contract_name) in enumerate(contracts):
+            trivial, code, truncated = self._prepare_contract(contract_code)
+            if trivial is not None:
+                results[index] = trivial
+                continue
+            cache_key = self._result_cache_key(code, contract_name, truncated)
+            cached = self._get_cached_result(cache_key)
+            if cached is not None:
+                results[index] = cached
+                continue
+            if truncated:
+                single.append(index)
+                continue
+            if (not packs or len(packs[-1]) >= config.llm_pack_max_contracts
+                    or pack_size + len(code) > config.llm_max_contract_size):
+                packs.append([])
+                pack_size = 0
+            packs[-1].append((index, code, contract_name, cache_key))
+            pack_size += len(code)
+        
+        packed = await asyncio.gather(*(self._audit_pack_openai(pack) for pack in packs))
+        for answers in packed:
+            for index, result in answers.items():
+                results[index] = result
+        
+        # Oversized contracts and anything a pack did not answer
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            retried = await asyncio.gather(
+                *(self.audit_async(*contracts[i]) for i in missing)
+            )
+            for i, result in zip(missing, retried):
+                results[i] = result
+        return results
+    
+    async def _audit_pack_openai(self, pack: List[Tuple[int, str, str, bytes]]) -> Dict[int, LLMAuditResult]:
+        """Audit one pack of contracts in a single request; returns answers by input index"""
+        if len(pack) == 1:
+            index, code, name, cache_key = pack[0]
+            result = await self._audit_with_openai_async(code, name)
+            self._cache_result(cache_key, result)
+            return {index: result}
+        
+        prompt = _PACKED_PROMPT_TEMPLATE.format(contracts="".join(
+            f"\n---CONTRACT {position}: {name}---\n{code}\n"
+            for position, (_, code, name, _) in enumerate(pack)
+        ))
+        max_tokens = 2000 * len(pack)
+        
+        async def _call_api():
+            async with self._throttled(prompt, max_tokens=max_tokens):
+                return await asyncio.wait_for(
+                    self._get_async_client().chat.completions.create(
+                        model=self.model,
+                        messages=[
+                            {"role": "system", "content": _SYSTEM_PROMPT},
+                            {"role": "user", "content": prompt}
+                        ],
+                        temperature=0.3,
+                        max_tokens=max_tokens,
+                        response_format={"type": "json_object"}
+                    ),
+                    timeout=config.llm_request_timeout
+                )
+        
+        answers: Dict[int, LLMAuditResult] = {}
+        try:
+            response = await _call_with_retry(_call_api)
+            items = self._json_loads(response.choices[0].message.content).get("results") or []
+        except Exception as e:
+            logger.warning("Packed audit of %d contracts failed, auditing individually: %s", len(pack), e)
+            return answers
+        
+        # Token usage is shared evenly between the contracts of the pack
+        tokens_used = response.usage.total_tokens if hasattr(response, 'usage') else 0
+        for item in items:
+            position = item.get("index") if isinstance(item, dict) else None
+            if not isinstance(position, int) or not 0 <= position < len(pack):
+                continue
+            index, _, _, cache_key = pack[position]
+            result = self._result_from_data(item)
+            result.tokens_used = tokens_used // len(pack)
+            self._cache_result(cache_key, result)
+            answers[index] = result
+        return answers
+    
+    async def _audit_many_openai_batch(self, contracts: List[Tuple[str, str]]) -> List[LLMAuditResult]:
+        """Run uncached audits through the OpenAI Batch API"""
+        results: List[Optional[LLMAuditResult]] = [None] * len(contracts)
+        pending = {}
+        lines = []
+        
+        for index, (contract_code, contract_name) in enumerate(contracts):
+            trivial, code, truncated = self._prepare_contract(contract_code)
+            if trivial is not None:
+                results[index] = trivial
+                continue
+            cache_key = self._result_cache_key(code, contract_name, truncated)
+            cached = self._get_cached_result(cache_key)
+            if cached is not None:
+                results[index] = cached
+                continue
+            pending[str(index)] = cache_key
+            lines.append(json.dumps({
+                "custom_id": str(index),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model,
+                    "messages": [
+                        {"role": "system", "content": _SYSTEM_PROMPT},
+                        {"role": "user", "content": self._build_audit_prompt(code, contract_name, truncated)}
+                    ],
+                    "temperature": 0.3,
+                    "max_tokens": 2000,
+                    "response_format": {"type": "json_object"}
+                }
+            }))
+        
+        if lines:
+            client = self._get_async_client()
+            try:
+                batch_file = await client.files.create(
+                    file=("audits.jsonl", "\n".join(lines).encode("utf-8")),
+                    purpose="batch"
+                )
+                batch = await client.batches.create(
+                    input_file_id=batch_file.id,
+                    endpoint="/v1/chat/completions",
+                    completion_window="24h"
+                )
+                logger.info("Submitted LLM batch %s with %d audits", batch.id, len(lines))
+                while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                    await asyncio.sleep(config.llm_batch_poll_seconds)
+                    batch = await client.batches.retrieve(batch.id)
+                
+                if batch.status == "completed" and batch.output_file_id:
+                    output = await client.files.content(batch.output_file_id)
+                    for line in output.text.splitlines():
+                        item = self._json_loads(line)
+                        custom_id = item.get("custom_id")
+                        body = (item.get("response") or {}).get("body") or {}
+                        if custom_id not in pending or not body.get("choices"):
+                            continue
+                        result = self._parse_strict_json(body["choices"][0]["message"]["content"])
+                        result.tokens_used = (body.get("usage") or {}).get("total_tokens", 0)
+                        self._cache_result(pending[custom_id], result)
+                        results[int(custom_id)] = result
+                else:
+                    logger.warning("LLM batch %s ended with status %s", batch.id, batch.status)
+            except Exception as e:
+                logger.error("LLM batch audit failed: %s", e, exc_info=True)
+        
+        # Anything the batch did not answer is audited interactively
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            retried = await asyncio.gather(
+                *(self.audit_async(*contracts[i]) for i in missing)
+            )
+            for i, result in zip(missing, retried):
+                results[i] = result
+        return results
+    
+    def _audit_with_openai(self, contract_code: str, contract_name: str, truncated: bool = False) -> LLMAuditResult:
         """Perform audit using OpenAI API (sync)"""
         
-        prompt = self._build_audit_prompt(contract_code, contract_name)
+        prompt = self._build_audit_prompt(contract_code, contract_name, truncated)
         
         try:
             response = self.client.chat.completions.create(
@@ -194,7 +822,7 @@ class LLMAuditor:
                 messages=[
                     {
                         "role": "system",
-                        "content": "You are an expert Solidity security auditor. Analyze smart contracts for vulnerabilities, logic flaws, and best practice violations. Return a valid JSON response."
+                        "content": _SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
@@ -208,84 +836,62 @@ class LLMAuditor:
             
             response_text = response.choices[0].message.content
             tokens_used = response.usage.total_tokens if hasattr(response, 'usage') else 0
-            result = self._parse_audit_response(response_text)
+            result = self._parse_strict_json(response_text)
             result.tokens_used = tokens_used
             return result
             
         except Exception as e:
-            logger.warning(f"OpenAI JSON mode failed, trying fallback: {e}")
+            logger.warning("OpenAI JSON mode failed, trying fallback: %s", e)
             # Fallback: try without JSON mode
-            return self._audit_with_openai_fallback(contract_code, contract_name)
+            return self._audit_with_openai_fallback(contract_code, contract_name, truncated)
     
-    async def _audit_with_openai_async(self, contract_code: str, contract_name: str) -> LLMAuditResult:
+    async def _audit_with_openai_async(self, contract_code: str, contract_name: str, truncated: bool = False) -> LLMAuditResult:
         """Perform audit using OpenAI API (async) with retry logic"""
         
-        prompt = self._build_audit_prompt(contract_code, contract_name)
+        prompt = self._build_audit_prompt(contract_code, contract_name, truncated)
         
-        # Retry function with exponential backoff
-        async def _call_api_with_retry():
-            max_attempts = 3
-            for attempt in range(max_attempts):
-                try:
-                    response = await asyncio.wait_for(
-                        self.async_client.chat.completions.create(
-                            model=self.model,
-                            messages=[
-                                {
-                                    "role": "system",
-                                    "content": "You are an expert Solidity security auditor. Analyze smart contracts for vulnerabilities, logic flaws, and best practice violations. Return a valid JSON response."
-                                },
-                                {
-                                    "role": "user",
-                                    "content": prompt
-                                }
-                            ],
-                            temperature=0.3,
-                            max_tokens=2000,
-                            response_format={"type": "json_object"}
-                        ),
-                        timeout=60.0  # 60 second timeout
-                    )
-                    return response
-                except asyncio.TimeoutError:
-                    if attempt < max_attempts - 1:
-                        wait_time = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s
-                        logger.warning(f"OpenAI API timeout (attempt {attempt + 1}/{max_attempts}), retrying in {wait_time}s...")
-                        await asyncio.sleep(wait_time)
-                    else:
-                        raise LLMAuditException("OpenAI API request timed out after 3 attempts")
-                except Exception as e:
-                    if attempt < max_attempts - 1:
-                        wait_time = 2 ** attempt
-                        logger.warning(f"OpenAI API error (attempt {attempt + 1}/{max_attempts}): {e}, retrying in {wait_time}s...")
-                        await asyncio.sleep(wait_time)
-                    else:
-                        raise
+        async def _call_api():
+            async with self._throttled(prompt, max_tokens=2000):
+                return await asyncio.wait_for(
+                    self._get_async_client().chat.completions.create(
+                        model=self.model,
+                        messages=[
+                            {
+                                "role": "system",
+                                "content": _SYSTEM_PROMPT
+                            },
+                            {
+                                "role": "user",
+                                "content": prompt
+                            }
+                        ],
+                        temperature=0.3,
+                        max_tokens=2000,
+                        response_format={"type": "json_object"}
+                    ),
+                    timeout=config.llm_request_timeout
+                )
         
         try:
-            response = await _call_api_with_retry()
+            response = await _call_with_retry(_call_api)
             response_text = response.choices[0].message.content
             tokens_used = response.usage.total_tokens if hasattr(response, 'usage') else 0
-            result = self._parse_audit_response(response_text)
+            result = self._parse_strict_json(response_text)
             result.tokens_used = tokens_used
             return result
             
         except Exception as e:
-            logger.warning(f"OpenAI async JSON mode failed, trying fallback: {e}")
+            logger.warning("OpenAI async JSON mode failed, trying fallback: %s", e)
             # Fallback: try without JSON mode
-            return await self._audit_with_openai_fallback_async(contract_code, contract_name)
+            return await self._audit_with_openai_fallback_async(contract_code, contract_name, truncated)
     
-    def _audit_with_openai_fallback(self, contract_code: str, contract_name: str) -> LLMAuditResult:
+    def _audit_with_openai_fallback(self, contract_code: str, contract_name: str, truncated: bool = False) -> LLMAuditResult:
         """Fallback audit without JSON mode (sync)"""
         
-        simple_prompt = f"""Analyze this Solidity contract for security issues:
-
-{contract_code}
-
-Provide a brief security assessment covering:
-1. Critical vulnerabilities
-2. Recommendations
-3. Risk level (LOW/MEDIUM/HIGH/CRITICAL)"""
+        simple_prompt = _FALLBACK_PROMPT_TEMPLATE.format(
+            code=contract_code,
+            marker=TRUNCATION_MARKER if truncated else ""
+        )
         
         try:
             response = self.client.chat.completions.create(
@@ -293,7 +899,7 @@ Provide a brief security assessment covering:
                 messages=[
                     {
                         "role": "system",
-                        "content": "You are a Solidity security expert. Provide practical security advice."
+                        "content": _FALLBACK_SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
@@ -316,28 +922,24 @@ Provide a brief security assessment covering:
                 tokens_used=tokens_used
             )
         except Exception as e:
-            logger.error(f"OpenAI fallback failed: {e}", exc_info=True)
+            logger.error("OpenAI fallback failed: %s", e, exc_info=True)
             raise LLMAuditException(f"LLM audit failed: {str(e)}")
     
-    async def _audit_with_openai_fallback_async(self, contract_code: str, contract_name: str) -> LLMAuditResult:
+    async def _audit_with_openai_fallback_async(self, contract_code: str, contract_name: str, truncated: bool = False) -> LLMAuditResult:
         """Fallback audit without JSON mode (async)"""
         
-        simple_prompt = f"""Analyze this Solidity contract for security issues:
-
-{contract_code}
-
-Provide a brief security assessment covering:
-1. Critical vulnerabilities
-2. Recommendations
-3. Risk level (LOW/MEDIUM/HIGH/CRITICAL)"""
+        simple_prompt = _FALLBACK_PROMPT_TEMPLATE.format(
+            code=contract_code,
+            marker=TRUNCATION_MARKER if truncated else ""
+        )
         
         try:
-            response = await self.async_client.chat.completions.create(
+            response = await self._get_async_client().chat.completions.create(
                 model=self.model,
                 messages=[
                     {
                         "role": "system",
-                        "content": "You are a Solidity security expert. Provide practical security advice."
+                        "content": _FALLBACK_SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
@@ -360,13 +962,13 @@ Provide a brief security assessment covering:
                 tokens_used=tokens_used
             )
         except Exception as e:
-            logger.error(f"OpenAI async fallback failed: {e}", exc_info=True)
+            logger.error("OpenAI async fallback failed: %s", e, exc_info=True)
             raise LLMAuditException(f"LLM audit failed: {str(e)}")
     
-    def _audit_with_anthropic(self, contract_code: str, contract_name: str) -> LLMAuditResult:
+    def _audit_with_anthropic(self, contract_code: str, contract_name: str, truncated: bool = False) -> LLMAuditResult:
         """Perform audit using Anthropic/Claude API"""
         
-        prompt = self._build_audit_prompt(contract_code, contract_name)
+        prompt = self._build_audit_prompt(contract_code, contract_name, truncated)
         
         try:
             message = self.client.messages.create(
@@ -382,45 +984,87 @@ Provide a brief security assessment covering:
             
             response_text = message.content[0].text
             tokens_used = message.usage.input_tokens + message.usage.output_tokens if hasattr(message, 'usage') else 0
-            result = self._parse_audit_response(response_text)
+            result = self._parse_loose_json(response_text)
+            result.tokens_used = tokens_used
+            return result
+            
+        except Exception as e:
+            logger.error("Anthropic API call failed: %s", e, exc_info=True)
+            raise LLMAuditException(f"Anthropic audit failed: {str(e)}")
+    
+    async def _audit_with_anthropic_async(self, contract_code: str, contract_name: str, truncated: bool = False) -> LLMAuditResult:
+        """Perform audit using Anthropic/Claude API (async) with retry logic"""
+        
+        prompt = self._build_audit_prompt(contract_code, contract_name, truncated)
+        
+        try:
+            async def _call_api():
+                async with self._throttled(prompt, max_tokens=2000):
+                    return await asyncio.wait_for(
+                        self._get_async_client().messages.create(
+                            model=self.model,
+                            max_tokens=2000,
+                            messages=[
+                                {
+                                    "role": "user",
+                                    "content": prompt
+                                }
+                            ]
+                        ),
+                        timeout=config.llm_request_timeout
+                    )
+            
+            message = await _call_with_retry(_call_api)
+            
+            response_text = message.content[0].text
+            tokens_used = message.usage.input_tokens + message.usage.output_tokens if hasattr(message, 'usage') else 0
+            result = self._parse_loose_json(response_text)
             result.tokens_used = tokens_used
             return result
             
         except Exception as e:
-            logger.error(f"Anthropic API call failed: {e}", exc_info=True)
+            logger.error("Anthropic async API call failed: %s", e, exc_info=True)
             raise LLMAuditException(f"Anthropic audit failed: {str(e)}")
     
-    def _build_audit_prompt(self, contract_code: str, contract_name: str) -> str:
+    def _build_audit_prompt(self, contract_code: str, contract_name: str, truncated: bool = False) -> str:
         """Build the audit prompt for LLM"""
         
-        return f"""Analyze this Solidity smart contract "{contract_name}" for security vulnerabilities:
-
-```solidity
-{contract_code}
-```
-
-Provide a security audit in JSON format with these fields:
-{{
-    "summary": "Brief overview of contract security posture",
-    "recommendations": ["List of actionable recommendations"],
-    "logic_vulnerabilities": ["Logic-level vulnerabilities not caught by static analysis"],
-    "best_practices": ["Best practices this contract should follow"],
-    "risk_assessment": "CRITICAL|HIGH|MEDIUM|LOW|INFO"
-}}
-
-Focus on:
-- Reentrancy and state management
-- Access control and authorization
-- Arithmetic operations and overflow/underflow
-- External calls and dependencies
-- Business logic flaws
-- Gas optimization issues
-- Compliance with DASP TOP 10
-
-Be specific with line references where possible."""
+        return _AUDIT_PROMPT_TEMPLATE.format(
+            name=contract_name,
+            code=contract_code,
+            marker=TRUNCATION_MARKER if truncated else ""
+        )
+    
+    @staticmethod
+    def _json_loads(text: str):
+        """Decode JSON, using orjson when installed"""
+        return orjson.loads(text) if ORJSON_AVAILABLE else json.loads(text)
     
-    def _parse_audit_response(self, response_text: str) -> LLMAuditResult:
-        """Parse LLM response into structured format"""
+    @staticmethod
+    def _result_from_data(audit_data: dict) -> LLMAuditResult:
+        """Build an LLMAuditResult from decoded audit JSON"""
+        return LLMAuditResult(
+            summary=audit_data.get("summary", ""),
+            recommendations=audit_data.get("recommendations", []),
+            logic_vulnerabilities=audit_data.get("logic_vulnerabilities", []),
+            best_practices=audit_data.get("best_practices", []),
+            risk_assessment=audit_data.get("risk_assessment", "MEDIUM")
+        )
+    
+    def _parse_strict_json(self, response_text: str) -> LLMAuditResult:
+        """Parse a JSON-mode response, which should be a bare JSON object"""
+        
+        try:
+            audit_data = self._json_loads(response_text)
+        except json.JSONDecodeError:
+            audit_data = None
+        if isinstance(audit_data, dict):
+            return self._result_from_data(audit_data)
+        # Model ignored JSON mode; fall back to extracting the object
+        return self._parse_loose_json(response_text)
+    
+    def _parse_loose_json(self, response_text: str) -> LLMAuditResult:
+        """Parse a free-form LLM response that may wrap JSON in prose"""
         
         try:
             # Try to extract JSON from response
@@ -429,7 +1073,7 @@ Be specific with line references where possible."""
             
             if json_start >= 0 and json_end > json_start:
                 json_str = response_text[json_start:json_end]
-                audit_data = json.loads(json_str)
+                audit_data = self._json_loads(json_str)
             else:
                 # Fallback: parse as plain text
                 audit_data = {
@@ -440,13 +1084,7 @@ Be specific with line references where possible."""
                     "risk_assessment": "MEDIUM"
                 }
             
-            return LLMAuditResult(
-                summary=audit_data.get("summary", ""),
-                recommendations=audit_data.get("recommendations", []),
-                logic_vulnerabilities=audit_data.get("logic_vulnerabilities", []),
-                best_practices=audit_data.get("best_practices", []),
-                risk_assessment=audit_data.get("risk_assessment", "MEDIUM")
-            )
+            return self._result_from_data(audit_data)
             
         except json.JSONDecodeError:
             # Last resort: return raw response
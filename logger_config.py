@@ -17,6 +17,9 @@ def setup_logging(
     """
     Setup application-wide logging
     
+    Idempotent: once handlers are installed, later calls (module reloads,
+    several entry points in one process) only update the level.
+    
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_file: Optional file path for log output
@@ -25,19 +28,25 @@ def setup_logging(
     Returns:
         Configured logger instance
     """
+    # Get root logger
+    logger = logging.getLogger("solidity_scanner")
+    logger.setLevel(getattr(logging, log_level.upper(), logging.INFO))
+    if logger.handlers:
+        return logger
+    
     if log_format is None:
         log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     
+    # The default format uses no thread/process fields, so skip collecting
+    # them for every record
+    if not any(field in log_format for field in ("%(thread", "%(process")):
+        logging.logThreads = False
+        logging.logProcesses = False
+        logging.logMultiprocessing = False
+    
     # Create formatter
     formatter = logging.Formatter(log_format, datefmt="%Y-%m-%d %H:%M:%S")
     
-    # Get root logger
-    logger = logging.getLogger("solidity_scanner")
-    logger.setLevel(getattr(logging, log_level.upper(), logging.INFO))
-    
-    # Remove existing handlers to avoid duplicates
-    logger.handlers.clear()
-    
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.DEBUG)
@@ -68,6 +77,3 @@ def get_logger(name: str) -> logging.Logger:
     """
     return logging.getLogger(f"solidity_scanner.{name}")
 
-
-# Default logger instance
-default_logger = setup_logging()
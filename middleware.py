@@ -2,58 +2,182 @@
 Middleware for FastAPI: Rate limiting, caching, and security
 """
 
+import math
 import time
+import json
 import hashlib
-from collections import defaultdict
+from collections import OrderedDict
 from functools import wraps
-from typing import Callable, Optional
+from typing import Callable, Optional, Tuple
 from fastapi import Request, HTTPException
 from starlette.middleware.base import BaseHTTPMiddleware
 from app_config import get_config
 from logger_config import get_logger
 
+# Optional Redis backend for sharing the analysis cache across workers
+try:
+    import redis.asyncio as redis_asyncio
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis_asyncio = None
+    REDIS_AVAILABLE = False
+
+# Optional fast JSON encoding for cached results
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
 logger = get_logger(__name__)
 config = get_config()
 
+# How long to stop trying Redis after a connection/command failure
+REDIS_RETRY_AFTER_SECONDS = 30
+
+# Sliding-window counter in Redis: check the weighted rate, then count the
+# request, atomically. KEYS: current window, previous window.
+# ARGV: previous-window weight, max requests, key TTL. Returns
+# {allowed, rate} with rate as a string (Lua numbers reply as integers).
+_RATE_LIMIT_SCRIPT = """
+local curr = tonumber(redis.call("GET", KEYS[1]) or "0")
+local prev = tonumber(redis.call("GET", KEYS[2]) or "0")
+local rate = prev * tonumber(ARGV[1]) + curr
+if rate >= tonumber(ARGV[2]) then
+    return {0, tostring(rate)}
+end
+if redis.call("INCR", KEYS[1]) == 1 then
+    redis.call("EXPIRE", KEYS[1], ARGV[3])
+end
+return {1, tostring(rate + 1)}
+"""
+
 
-class RateLimiter:
-    """Simple in-memory rate limiter"""
+class _RedisBackend:
+    """
+    Lazily connected Redis client shared by the in-process stores below
+    
+    After a Redis error the store works in-process only for
+    REDIS_RETRY_AFTER_SECONDS before trying Redis again.
+    """
     
-    def __init__(self, max_requests: Optional[int] = None, window_seconds: Optional[int] = None):
+    def _init_redis(self, redis_url: Optional[str]):
+        self.redis_url = redis_url if REDIS_AVAILABLE else None
+        if redis_url and not REDIS_AVAILABLE:
+            logger.warning("Redis requested for %s but redis is not installed; using in-process state", type(self).__name__)
+        self._redis = None
+        self._redis_retry_at = 0.0
+    
+    def _get_redis(self):
+        """Redis client, or None when disabled or recently unreachable"""
+        if self._redis is None:
+            if not self.redis_url:
+                return None
+            self._redis = redis_asyncio.from_url(
+                self.redis_url,
+                socket_timeout=0.5,
+                socket_connect_timeout=0.5
+            )
+        if time.time() < self._redis_retry_at:
+            return None
+        return self._redis
+    
+    def _redis_failed(self, e: Exception):
+        """Degrade to in-process state for a while after a Redis error"""
+        logger.warning("Redis unavailable for %s, using in-process state: %s", type(self).__name__, e)
+        self._redis_retry_at = time.time() + REDIS_RETRY_AFTER_SECONDS
+    
+    async def aclose(self):
+        """Close the Redis connection pool, if one was opened"""
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+class RateLimiter(_RedisBackend):
+    """
+    Simple in-memory rate limiter
+    
+    Uses a sliding-window counter: each client keeps only the request
+    counts of the current and previous fixed window, and the previous
+    count is weighted by how much of it still overlaps the sliding
+    window. O(1) time and constant memory per client, with no timestamp
+    lists to prune.
+    
+    When a Redis URL is given, acheck() keeps the counters in Redis so the
+    limit applies across all workers instead of per worker.
+    """
+    
+    def __init__(
+        self,
+        max_requests: Optional[int] = None,
+        window_seconds: Optional[int] = None,
+        redis_url: Optional[str] = None
+    ):
         self.max_requests = max_requests or config.rate_limit_max_requests
         self.window_seconds = window_seconds or config.rate_limit_window_seconds
-        self.requests = defaultdict(list)
+        self._init_redis(redis_url)
+        # key -> [previous window count, current window count, current window index]
+        self.counters = {}
+    
+    def _estimate(self, key: str, now: float):
+        """Rotate the key's windows up to `now` and estimate its request rate"""
+        window = self.window_seconds
+        index = int(now // window)
+        counter = self.counters.get(key)
+        if counter is None:
+            counter = self.counters[key] = [0, 0, index]
+        elif counter[2] != index:
+            # Previous window only carries over if it is directly adjacent
+            counter[0] = counter[1] if index - counter[2] == 1 else 0
+            counter[1] = 0
+            counter[2] = index
+        
+        overlap = 1.0 - (now - index * window) / window
+        return counter, counter[0] * overlap + counter[1]
     
     def is_allowed(self, key: str) -> bool:
         """Check if request is allowed"""
-        now = time.time()
-        window_start = now - self.window_seconds
-        
-        # Clean old requests
-        self.requests[key] = [
-            req_time for req_time in self.requests[key]
-            if req_time > window_start
-        ]
+        counter, rate = self._estimate(key, time.time())
         
         # Check limit
-        if len(self.requests[key]) >= self.max_requests:
+        if rate >= self.max_requests:
             return False
         
-        # Add current request
-        self.requests[key].append(now)
+        # Count current request
+        counter[1] += 1
         return True
     
     def get_remaining(self, key: str) -> int:
         """Get remaining requests in current window"""
-        now = time.time()
-        window_start = now - self.window_seconds
+        _, rate = self._estimate(key, time.time())
+        return max(0, math.ceil(self.max_requests - rate))
+    
+    async def acheck(self, key: str) -> Tuple[bool, int]:
+        """
+        Count a request and report (allowed, remaining)
         
-        self.requests[key] = [
-            req_time for req_time in self.requests[key]
-            if req_time > window_start
-        ]
+        Uses the shared Redis counters when enabled, otherwise (or while
+        Redis is unreachable) the in-process ones.
+        """
+        redis_client = self._get_redis()
+        if redis_client is not None:
+            now = time.time()
+            index = int(now // self.window_seconds)
+            overlap = 1.0 - (now - index * self.window_seconds) / self.window_seconds
+            try:
+                allowed, rate = await redis_client.eval(
+                    _RATE_LIMIT_SCRIPT, 2,
+                    f"ratelimit:{key}:{index}", f"ratelimit:{key}:{index - 1}",
+                    overlap, self.max_requests, self.window_seconds * 2
+                )
+                return bool(allowed), max(0, math.ceil(self.max_requests - float(rate)))
+            except Exception as e:
+                self._redis_failed(e)
         
-        return max(0, self.max_requests - len(self.requests[key]))
+        allowed = self.is_allowed(key)
+        return allowed, self.get_remaining(key)
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
@@ -72,8 +196,8 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         client_ip = request.client.host if request.client else "unknown"
         
         # Check rate limit
-        if not self.rate_limiter.is_allowed(client_ip):
-            remaining = self.rate_limiter.get_remaining(client_ip)
+        allowed, remaining = await self.rate_limiter.acheck(client_ip)
+        if not allowed:
             raise HTTPException(
                 status_code=429,
                 detail=f"Rate limit exceeded. Try again later. ({remaining} requests remaining)"
@@ -82,7 +206,6 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         response = await call_next(request)
         
         # Add rate limit headers
-        remaining = self.rate_limiter.get_remaining(client_ip)
         response.headers["X-RateLimit-Remaining"] = str(remaining)
         response.headers["X-RateLimit-Limit"] = str(self.rate_limiter.max_requests)
         
@@ -90,55 +213,145 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
 
 
 # Simple cache for analysis results
-class AnalysisCache:
-    """In-memory cache for analysis results"""
+class AnalysisCache(_RedisBackend):
+    """
+    Cache for analysis results
     
-    def __init__(self, max_size: Optional[int] = None, ttl_seconds: Optional[int] = None):
-        self.cache = {}
+    Always keeps an in-process cache. When a Redis URL is given (and the
+    redis package is installed) the async aget_by_hash/aset_by_hash
+    methods also read and write Redis, so results are shared between
+    worker processes; the in-process cache stays in front as an L1.
+    """
+    
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        redis_url: Optional[str] = None
+    ):
+        # Kept in LRU order (least recently used first) for O(1) eviction
+        self.cache: OrderedDict = OrderedDict()
         self.max_size = max_size or config.cache_max_size
         self.ttl_seconds = ttl_seconds or config.cache_ttl_seconds
+        self._init_redis(redis_url)
+    
+    @staticmethod
+    def hash_key(contract_code: str, contract_name: str, kind: str = "static") -> bytes:
+        """
+        Content-addressed cache key: SHA-256 digest of kind, code and name
+        
+        The kind namespace is hashed first so entries of different kinds
+        (static reports, LLM audits per model) can never share a key,
+        whatever the caller-supplied name contains.
+        
+        Callers that need the key more than once (lookup, store, ETag)
+        should compute it once and use get_by_hash/set_by_hash.
+        """
+        hasher = hashlib.sha256(kind.encode('utf-8'))
+        hasher.update(b'\x00')
+        hasher.update(contract_code.encode('utf-8'))
+        hasher.update(b'\x00')
+        hasher.update(contract_name.encode('utf-8'))
+        return hasher.digest()
     
     def _generate_key(self, contract_code: str, contract_name: str) -> str:
-        """Generate cache key using SHA-256 (secure hash)"""
-        content = f"{contract_code}:{contract_name}"
-        return hashlib.sha256(content.encode()).hexdigest()
+        """Generate cache key using SHA-256 (secure hash), hex-encoded"""
+        return self.hash_key(contract_code, contract_name).hex()
     
     def get(self, contract_code: str, contract_name: str):
         """Get cached result"""
-        key = self._generate_key(contract_code, contract_name)
-        
-        if key in self.cache:
-            cached_time, result = self.cache[key]
+        return self.get_by_hash(self.hash_key(contract_code, contract_name))
+    
+    def set(self, contract_code: str, contract_name: str, result):
+        """Cache result"""
+        self.set_by_hash(self.hash_key(contract_code, contract_name), result)
+    
+    def get_by_hash(self, key: bytes):
+        """Get cached result by a key from hash_key()"""
+        entry = self.cache.get(key)
+        if entry is not None:
+            cached_time, result = entry
             if time.time() - cached_time < self.ttl_seconds:
+                self.cache.move_to_end(key)
                 return result
             else:
                 del self.cache[key]
         
         return None
     
-    def set(self, contract_code: str, contract_name: str, result):
-        """Cache result"""
-        key = self._generate_key(contract_code, contract_name)
-        
-        # Evict oldest if cache is full
-        if len(self.cache) >= self.max_size:
-            oldest_key = min(self.cache.keys(), key=lambda k: self.cache[k][0])
-            del self.cache[oldest_key]
+    def set_by_hash(self, key: bytes, result):
+        """Cache result under a key from hash_key()"""
+        if key in self.cache:
+            self.cache.move_to_end(key)
+        elif len(self.cache) >= self.max_size:
+            # Evict the least recently used entry
+            self.cache.popitem(last=False)
         
         self.cache[key] = (time.time(), result)
     
+    @staticmethod
+    def _redis_key(key: bytes) -> str:
+        return f"scan:{key.hex()}"
+    
+    async def aget_by_hash(self, key: bytes):
+        """Get cached result, falling back to Redis on an in-process miss"""
+        result = self.get_by_hash(key)
+        if result is not None:
+            return result
+        
+        redis_client = self._get_redis()
+        if redis_client is None:
+            return None
+        
+        try:
+            payload = await redis_client.get(self._redis_key(key))
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+        
+        if payload is None:
+            return None
+        try:
+            result = orjson.loads(payload) if ORJSON_AVAILABLE else json.loads(payload)
+        except ValueError as e:
+            # Corrupt or foreign value: treat as a miss and drop it
+            logger.warning("Discarding undecodable cache entry %s: %s", self._redis_key(key), e)
+            try:
+                await redis_client.delete(self._redis_key(key))
+            except Exception as e:
+                self._redis_failed(e)
+            return None
+        self.set_by_hash(key, result)
+        return result
+    
+    async def aset_by_hash(self, key: bytes, result):
+        """Cache result in-process and, when enabled, in Redis"""
+        self.set_by_hash(key, result)
+        
+        redis_client = self._get_redis()
+        if redis_client is None:
+            return
+        
+        payload = orjson.dumps(result) if ORJSON_AVAILABLE else json.dumps(result)
+        try:
+            await redis_client.set(self._redis_key(key), payload, ex=self.ttl_seconds)
+        except Exception as e:
+            self._redis_failed(e)
+    
     def clear(self):
-        """Clear cache"""
+        """Clear cache (in-process only)"""
         self.cache.clear()
 
 
 # Global instances (use config values)
 rate_limiter = RateLimiter(
     max_requests=config.rate_limit_max_requests,
-    window_seconds=config.rate_limit_window_seconds
+    window_seconds=config.rate_limit_window_seconds,
+    redis_url=config.redis_url if config.rate_limit_redis_enabled else None
 )
 analysis_cache = AnalysisCache(
     max_size=config.cache_max_size,
-    ttl_seconds=config.cache_ttl_seconds
+    ttl_seconds=config.cache_ttl_seconds,
+    redis_url=config.redis_url if config.cache_redis_enabled else None
 )
 
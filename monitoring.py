@@ -5,14 +5,26 @@ Prometheus metrics, structured logging, health checks
 
 from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
 from fastapi import Response
-from typing import Dict
+from functools import wraps
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+import os
 import time
 from app_config import get_config
 from logger_config import get_logger
 
+# Optional process stats for the detailed health check
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
 logger = get_logger(__name__)
 config = get_config()
 
+# psutil.Process for this worker, created on the first health check
+_process = None
+
 # Prometheus metrics
 analysis_counter = Counter(
     'scanner_analyses_total',
@@ -38,10 +50,14 @@ api_requests = Counter(
     ['method', 'endpoint', 'status']
 )
 
+# Fewer buckets than the client default, still covering LLM-backed requests
+API_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0, 30.0)
+
 api_request_duration = Histogram(
     'scanner_api_request_duration_seconds',
     'API request duration',
-    ['method', 'endpoint']
+    ['method', 'endpoint'],
+    buckets=API_DURATION_BUCKETS
 )
 
 active_analyses = Gauge(
@@ -62,33 +78,88 @@ cache_misses = Counter(
 )
 
 
+# Endpoint label for requests that matched no route (404s, static files),
+# so scans of random URLs cannot create unbounded label sets
+UNMATCHED_ENDPOINT = "__other__"
+# Hard cap on distinct endpoint labels; anything beyond shares one label
+MAX_ENDPOINT_LABELS = 256
+OVERFLOW_ENDPOINT = "__overflow__"
+# Probe and scrape endpoints, not measured by default
+DEFAULT_SKIP_PATHS = frozenset({"/metrics", "/health", "/healthz", "/livez", "/readyz"})
+
+
 class MetricsMiddleware:
-    """Middleware to track API metrics"""
+    """
+    Middleware to track API metrics
+    
+    Labelled metric children are looked up once per (method, endpoint)
+    and status and kept, so a request costs two dict lookups plus
+    inc()/observe() instead of a labels() call per metric. Requests to
+    skip_paths (health probes, the /metrics scrape) are not measured.
+    """
     
-    def __init__(self, app):
+    def __init__(self, app, skip_paths: Optional[Iterable[str]] = None):
         self.app = app
+        self.skip_paths = frozenset(DEFAULT_SKIP_PATHS if skip_paths is None else skip_paths)
+        # (method, endpoint) -> (endpoint label, duration child, {status: counter child})
+        self._children: Dict[Tuple[str, str], Tuple[str, Any, Dict[int, Any]]] = {}
+        # Endpoint labels in use, capped at MAX_ENDPOINT_LABELS
+        self._known_endpoints: Set[str] = {OVERFLOW_ENDPOINT}
+    
+    def _children_for(self, method: str, endpoint: str) -> Tuple[str, Any, Dict[int, Any]]:
+        key = (method, endpoint)
+        children = self._children.get(key)
+        if children is None:
+            if endpoint not in self._known_endpoints:
+                if len(self._known_endpoints) >= MAX_ENDPOINT_LABELS:
+                    return self._children_for(method, OVERFLOW_ENDPOINT)
+                self._known_endpoints.add(endpoint)
+            children = (endpoint, api_request_duration.labels(method, endpoint), {})
+            self._children[key] = children
+        return children
     
     async def __call__(self, scope, receive, send):
-        if scope["type"] != "http":
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
             await self.app(scope, receive, send)
             return
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         method = scope["method"]
-        path = scope["path"]
         
         # Track request
         async def send_wrapper(message):
             if message["type"] == "http.response.start":
+                # Label by route template (set by the router once matched)
+                route = scope.get("route")
+                endpoint = getattr(route, "path", None) or UNMATCHED_ENDPOINT
+                endpoint, duration_child, status_children = self._children_for(method, endpoint)
                 status_code = message["status"]
-                api_requests.labels(method=method, endpoint=path, status=status_code).inc()
-                duration = time.time() - start_time
-                api_request_duration.labels(method=method, endpoint=path).observe(duration)
+                counter = status_children.get(status_code)
+                if counter is None:
+                    counter = api_requests.labels(method, endpoint, status_code)
+                    status_children[status_code] = counter
+                counter.inc()
+                duration_child.observe(time.perf_counter() - start_time)
             await send(message)
         
         await self.app(scope, receive, send_wrapper)
 
 
+# Labelled children of the analysis metrics, by label values (the label
+# sets are small: severities, analysis types, vulnerability types)
+_analysis_children: Dict[Tuple[str, ...], Any] = {}
+_duration_children: Dict[Tuple[str, ...], Any] = {}
+_vulnerability_children: Dict[Tuple[str, ...], Any] = {}
+
+
+def _child(children: Dict[Tuple[str, ...], Any], metric, key: Tuple[str, ...]):
+    """Labelled child of metric for key, created on first use"""
+    child = children.get(key)
+    if child is None:
+        child = children[key] = metric.labels(*key)
+    return child
+
+
 def record_analysis(
     severity: str,
     has_llm: bool,
@@ -98,15 +169,24 @@ def record_analysis(
     vulnerabilities: list = None
 ):
     """Record analysis metrics"""
-    analysis_counter.labels(severity=severity, has_llm=str(has_llm)).inc()
-    analysis_duration.labels(analysis_type=analysis_type).observe(duration)
+    _child(_analysis_children, analysis_counter, (severity, str(has_llm))).inc()
+    _child(_duration_children, analysis_duration, (analysis_type,)).observe(duration)
     
     if vulnerabilities:
         for vuln in vulnerabilities:
-            vulnerability_counter.labels(
-                vulnerability_type=vuln.get('type', 'unknown'),
-                severity=vuln.get('severity', 'UNKNOWN')
-            ).inc()
+            _child(_vulnerability_children, vulnerability_counter, (
+                vuln.get('type', 'unknown'),
+                vuln.get('severity', 'UNKNOWN')
+            )).inc()
+
+
+def track_active_analysis(func):
+    """Count running calls of an async analysis function in active_analyses"""
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        with active_analyses.track_inprogress():
+            return await func(*args, **kwargs)
+    return wrapper
 
 
 def record_cache_hit(cache_type: str = "analysis"):
@@ -119,40 +199,70 @@ def record_cache_miss(cache_type: str = "analysis"):
     cache_misses.labels(cache_type=cache_type).inc()
 
 
+# (rendered at, payload) of the last /metrics scrape
+_metrics_cache: Tuple[float, bytes] = (0.0, b"")
+
+
+def latest_metrics() -> bytes:
+    """
+    Prometheus text exposition, reused for config.metrics_cache_ttl seconds
+    
+    Rendering walks every collector and formats every sample, so
+    concurrent or frequent scrapes share one payload. generate_latest()
+    is synchronous, so callers on the event loop cannot interleave here.
+    """
+    global _metrics_cache
+    now = time.monotonic()
+    rendered_at, payload = _metrics_cache
+    if payload and now - rendered_at < config.metrics_cache_ttl:
+        return payload
+    payload = generate_latest()
+    _metrics_cache = (now, payload)
+    return payload
+
+
 def get_metrics_endpoint():
     """Get Prometheus metrics endpoint handler"""
     async def metrics():
         return Response(
-            content=generate_latest(),
+            content=latest_metrics(),
             media_type=CONTENT_TYPE_LATEST
         )
     return metrics
 
 
+def _current_process():
+    """psutil handle for this process, reused across health checks"""
+    global _process
+    # Re-create after a fork so the handle never describes the parent
+    if _process is None or _process.pid != os.getpid():
+        _process = psutil.Process()
+        # Prime the CPU counter; later calls report usage since the last one
+        _process.cpu_percent(interval=None)
+    return _process
+
+
 def get_health_check() -> Dict:
     """Get detailed health check information"""
-    try:
-        import psutil
-        import os
-        
-        process = psutil.Process(os.getpid())
-        
-        return {
-            "status": "healthy",
-            "version": "1.0.0",
-            "memory": {
-                "used_mb": round(process.memory_info().rss / 1024 / 1024, 2),
-                "percent": round(process.memory_percent(), 2)
-            },
-            "cpu": {
-                "percent": round(process.cpu_percent(interval=0.1), 2)
-            },
-            "uptime_seconds": round(time.time() - process.create_time(), 2)
-        }
-    except ImportError:
+    if not PSUTIL_AVAILABLE:
         # psutil not available, return basic health
         return {
             "status": "healthy",
             "version": "1.0.0",
             "note": "Detailed metrics require psutil package"
         }
+    
+    process = _current_process()
+    return {
+        "status": "healthy",
+        "version": "1.0.0",
+        "memory": {
+            "used_mb": round(process.memory_info().rss / 1024 / 1024, 2),
+            "percent": round(process.memory_percent(), 2)
+        },
+        "cpu": {
+            # Non-blocking: usage since the previous health check
+            "percent": round(process.cpu_percent(interval=None), 2)
+        },
+        "uptime_seconds": round(time.time() - process.create_time(), 2)
+    }
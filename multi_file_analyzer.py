@@ -3,9 +3,13 @@ Multi-File Contract Analyzer
 Supports analyzing projects with imports and multiple files
 """
 
-from typing import List, Dict, Set, Optional
+from collections import OrderedDict
+from typing import List, Dict, Set, Optional, Tuple
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import os
 import re
+import threading
 from app_config import get_config
 from logger_config import get_logger
 from static_analyzer import StaticAnalyzer, AnalysisResult, Vulnerability
@@ -13,6 +17,15 @@ from static_analyzer import StaticAnalyzer, AnalysisResult, Vulnerability
 logger = get_logger(__name__)
 config = get_config()
 
+# Threads per analyze_project call (file reads overlap with analysis)
+PROJECT_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Contract directories whose file listing is remembered (oldest dropped first)
+FILE_LIST_CACHE_SIZE = 16
+
+# `import "path";` / `import 'path';` statements
+_IMPORT_RE = re.compile(r'import\s+["\']([^"\']+)["\']\s*;')
+
 
 class MultiFileAnalyzer:
     """
@@ -23,6 +36,9 @@ class MultiFileAnalyzer:
     def __init__(self):
         self.static_analyzer = StaticAnalyzer()
         self.resolved_files: Dict[str, str] = {}  # Cache resolved file contents
+        # contracts dir -> (mtime_ns of every directory walked, .sol files)
+        self._file_list_cache: "OrderedDict[str, Tuple[Dict[str, int], List[Path]]]" = OrderedDict()
+        self._file_list_lock = threading.Lock()
         logger.info("Multi-file analyzer initialized")
     
     def detect_project_type(self, project_path: Path) -> Optional[str]:
@@ -69,51 +85,139 @@ class MultiFileAnalyzer:
             contracts_dir = project_path
         
         if contracts_dir.exists():
-            contract_files.extend(contracts_dir.rglob("*.sol"))
+            contract_files.extend(self._list_sol_files(str(contracts_dir)))
         
         logger.info(f"Found {len(contract_files)} contract files in {project_path}")
         return contract_files
     
-    def resolve_imports(self, contract_code: str, base_path: Path) -> str:
+    def _list_sol_files(self, root: str) -> List[Path]:
+        """
+        All .sol files under root, reusing the last walk if nothing changed
+        
+        Adding, removing or renaming an entry updates its directory's
+        mtime, so one stat per directory validates the cached listing.
+        """
+        cached = self._file_list_cache.get(root)
+        if cached is not None:
+            dir_mtimes, files = cached
+            try:
+                if all(os.stat(d).st_mtime_ns == m for d, m in dir_mtimes.items()):
+                    return list(files)
+            except OSError:
+                pass
+        
+        dir_mtimes: Dict[str, int] = {}
+        files: List[Path] = []
+        pending = [root]
+        while pending:
+            directory = pending.pop()
+            try:
+                dir_mtimes[directory] = os.stat(directory).st_mtime_ns
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        # Symlinked directories are not followed
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.name.endswith(".sol") and entry.is_file():
+                            files.append(Path(entry.path))
+            except OSError as e:
+                logger.warning(f"Failed to list {directory}: {e}")
+        
+        with self._file_list_lock:
+            self._file_list_cache[root] = (dir_mtimes, files)
+            if len(self._file_list_cache) > FILE_LIST_CACHE_SIZE:
+                self._file_list_cache.popitem(last=False)
+        return list(files)
+    
+    def resolve_imports(
+        self,
+        contract_code: str,
+        base_path: Path,
+        resolved_files: Optional[Dict[Path, str]] = None
+    ) -> str:
         """
         Resolve import statements in contract code
         
         Args:
             contract_code: Contract source code
             base_path: Base path for resolving relative imports
+            resolved_files: Resolved text per imported file, keyed by
+                absolute path; pass the same dict for every file of a
+                project so shared imports are read and resolved once
             
         Returns:
             Contract code with imports resolved (concatenated)
         """
-        import_pattern = r'import\s+["\']([^"\']+)["\']\s*;'
-        imports = re.findall(import_pattern, contract_code)
+        if resolved_files is None:
+            resolved_files = {}
+        return self._inline_imports(contract_code, base_path, resolved_files, set())
+    
+    def _inline_imports(
+        self,
+        contract_code: str,
+        base_path: Path,
+        resolved_files: Dict[Path, str],
+        resolving: Set[Path]
+    ) -> str:
+        """resolve_imports with the chain of files currently being resolved"""
+        # Substring search is far cheaper than running the regex, and most
+        # leaf files import nothing
+        if 'import' not in contract_code:
+            return contract_code
         
-        resolved_code = contract_code
-        resolved_imports: Set[str] = set()
+        resolved_imports: Dict[str, Optional[str]] = {}
         
-        for import_path in imports:
-            if import_path in resolved_imports:
-                continue  # Already resolved
-            
-            # Try different import path formats
-            import_file = self._resolve_import_path(import_path, base_path)
+        def _inline(match) -> str:
+            import_path = match.group(1)
+            if import_path not in resolved_imports:
+                resolved_imports[import_path] = self._load_import(
+                    import_path, base_path, resolved_files, resolving
+                )
+            import_code = resolved_imports[import_path]
+            if import_code is None:
+                return match.group(0)
+            return f"\n// Imported: {import_path}\n{import_code}\n"
+        
+        # One pass over the code instead of a str.replace per import
+        return _IMPORT_RE.sub(_inline, contract_code)
+    
+    def _load_import(
+        self,
+        import_path: str,
+        base_path: Path,
+        resolved_files: Dict[Path, str],
+        resolving: Set[Path]
+    ) -> Optional[str]:
+        """Read an imported file with its own imports resolved, or None"""
+        # Try different import path formats
+        import_file = self._resolve_import_path(import_path, base_path)
+        if not import_file or not import_file.exists():
+            return None
+        
+        # resolve() folds "../" variants of the same file into one key
+        key = import_file.resolve()
+        resolved = resolved_files.get(key)
+        if resolved is not None:
+            return resolved
+        # Import cycle: leave the statement in place
+        if key in resolving:
+            return None
+        
+        resolving.add(key)
+        try:
+            import_code = import_file.read_text(encoding='utf-8')
             
-            if import_file and import_file.exists():
-                try:
-                    with open(import_file, 'r', encoding='utf-8') as f:
-                        import_code = f.read()
-                    
-                    # Recursively resolve imports in imported file
-                    import_code = self.resolve_imports(import_code, import_file.parent)
-                    
-                    # Remove import statement and add imported code
-                    import_stmt = f'import "{import_path}";'
-                    resolved_code = resolved_code.replace(import_stmt, f"\n// Imported: {import_path}\n{import_code}\n")
-                    resolved_imports.add(import_path)
-                except Exception as e:
-                    logger.warning(f"Failed to resolve import {import_path}: {e}")
-        
-        return resolved_code
+            # Recursively resolve imports in imported file
+            resolved = self._inline_imports(import_code, import_file.parent, resolved_files, resolving)
+        except Exception as e:
+            logger.warning(f"Failed to resolve import {import_path}: {e}")
+            return None
+        finally:
+            resolving.discard(key)
+        # Single dict store, atomic under the GIL; worker threads that race
+        # on the same file just resolve it twice
+        resolved_files[key] = resolved
+        return resolved
     
     def _resolve_import_path(self, import_path: str, base_path: Path) -> Optional[Path]:
         """Resolve an import path to a file"""
@@ -153,31 +257,46 @@ class MultiFileAnalyzer:
         project_type = self.detect_project_type(project_path)
         contract_files = self.find_contract_files(project_path, project_type)
         
-        results = {}
+        # Shared by all files so common imports are read and resolved once
+        resolved_files: Dict[Path, str] = {}
         
-        for contract_file in contract_files:
-            try:
-                with open(contract_file, 'r', encoding='utf-8') as f:
-                    contract_code = f.read()
-                
-                # Resolve imports
-                resolved_code = self.resolve_imports(contract_code, contract_file.parent)
-                
-                # Analyze
-                contract_name = contract_file.stem
-                result = self.static_analyzer.analyze(resolved_code, contract_name)
-                
-                results[str(contract_file)] = result
-                logger.info(f"Analyzed {contract_file}: {len(result.vulnerabilities)} vulnerabilities")
-                
-            except Exception as e:
-                logger.error(f"Failed to analyze {contract_file}: {e}")
-                results[str(contract_file)] = AnalysisResult(
-                    contract_name=contract_file.stem,
-                    vulnerabilities=[]
-                )
+        # Files are independent; threads overlap their reads and analysis
+        if len(contract_files) > 1:
+            max_workers = min(len(contract_files), PROJECT_MAX_WORKERS)
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="project") as executor:
+                file_results = list(executor.map(
+                    lambda contract_file: self._analyze_file(contract_file, resolved_files),
+                    contract_files
+                ))
+        else:
+            file_results = [self._analyze_file(f, resolved_files) for f in contract_files]
         
-        return results
+        return {
+            str(contract_file): result
+            for contract_file, result in zip(contract_files, file_results)
+        }
+    
+    def _analyze_file(self, contract_file: Path, resolved_files: Dict[Path, str]) -> AnalysisResult:
+        """Read, resolve imports and analyze one project file"""
+        try:
+            contract_code = contract_file.read_text(encoding='utf-8')
+            
+            # Resolve imports
+            resolved_code = self.resolve_imports(contract_code, contract_file.parent, resolved_files)
+            
+            # Analyze
+            contract_name = contract_file.stem
+            result = self.static_analyzer.analyze(resolved_code, contract_name)
+            
+            logger.info(f"Analyzed {contract_file}: {len(result.vulnerabilities)} vulnerabilities")
+            return result
+            
+        except Exception as e:
+            logger.error(f"Failed to analyze {contract_file}: {e}")
+            return AnalysisResult(
+                contract_name=contract_file.stem,
+                vulnerabilities=[]
+            )
     
     def analyze_with_imports(self, contract_code: str, contract_name: str, base_path: Optional[Path] = None) -> AnalysisResult:
         """
@@ -3,34 +3,47 @@ PDF Report Generation
 Creates professional PDF reports from analysis results
 """
 
-from typing import Dict
+import importlib.util
+import io
+from html import escape
+from typing import BinaryIO, Dict, Union
 from datetime import datetime
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
 from app_config import get_config
 from logger_config import get_logger
 
+# reportlab (and the PIL/font modules it pulls in) is imported on the first
+# report, not with this module; fail here so importers can still detect a
+# missing install with ImportError
+if importlib.util.find_spec("reportlab") is None:
+    raise ImportError("reportlab is required for PDF reports")
+
 logger = get_logger(__name__)
 config = get_config()
 
 
-def generate_pdf_report(analysis_result: Dict, output_path: str) -> str:
+def generate_pdf_report(analysis_result: Dict, output: Union[str, BinaryIO]) -> Union[str, BinaryIO]:
     """
     Generate PDF report from analysis results
     
+    Text from the analysis (names, descriptions, LLM output) is escaped
+    before it reaches reportlab's markup parser.
+    
     Args:
         analysis_result: Analysis result dictionary
-        output_path: Path to save PDF file
+        output: Path to save PDF file, or a binary file-like object
         
     Returns:
-        Path to generated PDF file
+        The path or file object the PDF was written to
     """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+    from reportlab.lib.enums import TA_CENTER
+    
     try:
-        doc = SimpleDocTemplate(output_path, pagesize=letter)
+        doc = SimpleDocTemplate(output, pagesize=letter)
         story = []
         styles = getSampleStyleSheet()
         
@@ -53,6 +66,12 @@ def generate_pdf_report(analysis_result: Dict, output_path: str) -> str:
             spaceBefore=12
         )
         
+        severity_heading_style = ParagraphStyle('SeverityHeading', parent=styles['Heading3'], fontSize=14)
+        footer_style = ParagraphStyle('Footer', parent=styles['Normal'], fontSize=8, alignment=TA_CENTER)
+        footer_warning_style = ParagraphStyle('FooterWarning', parent=footer_style, textColor=colors.red)
+        # Space below each entry via the style instead of a Spacer flowable
+        vulnerability_style = ParagraphStyle('Vulnerability', parent=styles['Normal'], spaceAfter=0.1*inch)
+        
         # Title
         story.append(Paragraph("Security Audit Report", title_style))
         story.append(Spacer(1, 0.2*inch))
@@ -84,10 +103,10 @@ def generate_pdf_report(analysis_result: Dict, output_path: str) -> str:
         # Summary
         story.append(Paragraph("Executive Summary", heading_style))
         summary_text = f"""
-        This security audit analyzed the smart contract <b>{analysis_result.get('contract_name', 'Unknown')}</b> 
+        This security audit analyzed the smart contract <b>{escape(str(analysis_result.get('contract_name', 'Unknown')))}</b> 
         and identified <b>{len(analysis_result.get('vulnerabilities', []))}</b> potential vulnerabilities.
         The overall risk score is <b>{analysis_result.get('risk_score', 0)}/100</b>, 
-        with a severity rating of <b>{analysis_result.get('severity', 'UNKNOWN')}</b>.
+        with a severity rating of <b>{escape(str(analysis_result.get('severity', 'UNKNOWN')))}</b>.
         """
         story.append(Paragraph(summary_text, styles['Normal']))
         story.append(Spacer(1, 0.2*inch))
@@ -110,19 +129,18 @@ def generate_pdf_report(analysis_result: Dict, output_path: str) -> str:
                 if severity in grouped:
                     story.append(Paragraph(
                         f"{severity} Severity ({len(grouped[severity])} found)",
-                        ParagraphStyle('SeverityHeading', parent=styles['Heading3'], fontSize=14)
+                        severity_heading_style
                     ))
                     
                     for i, vuln in enumerate(grouped[severity], 1):
-                        vuln_text = f"""
-                        <b>{i}. {vuln.get('type', 'Unknown').upper().replace('_', ' ')}</b><br/>
-                        <b>Line:</b> {vuln.get('line', '?')}<br/>
-                        <b>Description:</b> {vuln.get('description', 'N/A')}<br/>
-                        <b>Confidence:</b> {vuln.get('confidence', 0.8):.1%}<br/>
-                        <b>Remediation:</b> {vuln.get('remediation', 'N/A')}
-                        """
-                        story.append(Paragraph(vuln_text, styles['Normal']))
-                        story.append(Spacer(1, 0.1*inch))
+                        vuln_text = "<br/>".join((
+                            f"<b>{i}. {escape(str(vuln.get('type', 'Unknown')).upper().replace('_', ' '))}</b>",
+                            f"<b>Line:</b> {escape(str(vuln.get('line', '?')))}",
+                            f"<b>Description:</b> {escape(str(vuln.get('description', 'N/A')))}",
+                            f"<b>Confidence:</b> {vuln.get('confidence', 0.8):.1%}",
+                            f"<b>Remediation:</b> {escape(str(vuln.get('remediation', 'N/A')))}",
+                        ))
+                        story.append(Paragraph(vuln_text, vulnerability_style))
         else:
             story.append(Paragraph("No vulnerabilities detected!", styles['Normal']))
         
@@ -132,33 +150,34 @@ def generate_pdf_report(analysis_result: Dict, output_path: str) -> str:
             story.append(Paragraph("AI Security Audit", heading_style))
             llm = analysis_result['llm_audit']
             
-            story.append(Paragraph(f"<b>Risk Assessment:</b> {llm.get('risk_assessment', 'N/A')}", styles['Normal']))
+            story.append(Paragraph(f"<b>Risk Assessment:</b> {escape(str(llm.get('risk_assessment', 'N/A')))}", styles['Normal']))
             story.append(Spacer(1, 0.1*inch))
             
             story.append(Paragraph("<b>Summary:</b>", styles['Heading3']))
-            story.append(Paragraph(llm.get('summary', 'N/A'), styles['Normal']))
+            story.append(Paragraph(escape(str(llm.get('summary', 'N/A'))), styles['Normal']))
             story.append(Spacer(1, 0.1*inch))
             
             if llm.get('recommendations'):
                 story.append(Paragraph("<b>Recommendations:</b>", styles['Heading3']))
-                for rec in llm.get('recommendations', []):
-                    story.append(Paragraph(f"• {rec}", styles['Normal']))
+                bullets = "<br/>".join(f"• {escape(str(rec))}" for rec in llm['recommendations'])
+                story.append(Paragraph(bullets, styles['Normal']))
         
         # Footer
         story.append(Spacer(1, 0.3*inch))
         story.append(Paragraph(
             "<i>Generated by Solidity Vuln Scanner</i>",
-            ParagraphStyle('Footer', parent=styles['Normal'], fontSize=8, alignment=TA_CENTER)
+            footer_style
         ))
         story.append(Paragraph(
             "<i>⚠️ This report is for educational purposes only. Always conduct professional audits before deployment.</i>",
-            ParagraphStyle('Footer', parent=styles['Normal'], fontSize=8, alignment=TA_CENTER, textColor=colors.red)
+            footer_warning_style
         ))
         
         # Build PDF
         doc.build(story)
-        logger.info(f"PDF report generated: {output_path}")
-        return output_path
+        if isinstance(output, str):
+            logger.info(f"PDF report generated: {output}")
+        return output
         
     except Exception as e:
         logger.error(f"Failed to generate PDF report: {e}", exc_info=True)
@@ -175,23 +194,6 @@ def generate_pdf_report_bytes(analysis_result: Dict) -> bytes:
     Returns:
         PDF file as bytes
     """
-    import io
-    from reportlab.pdfgen import canvas
-    
     buffer = io.BytesIO()
-    # Use the same generation logic but write to buffer
-    # For simplicity, we'll use a temp file approach
-    import tempfile
-    import os
-    
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
-        tmp_path = tmp.name
-    
-    try:
-        generate_pdf_report(analysis_result, tmp_path)
-        with open(tmp_path, 'rb') as f:
-            pdf_bytes = f.read()
-        return pdf_bytes
-    finally:
-        if os.path.exists(tmp_path):
-            os.unlink(tmp_path)
+    generate_pdf_report(analysis_result, buffer)
+    return buffer.getvalue()
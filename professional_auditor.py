@@ -4,6 +4,7 @@ Enhanced analysis for professional security audits
 Includes compliance checking, risk assessment, and professional reporting
 """
 
+import re
 from typing import List, Dict, Optional
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
@@ -13,6 +14,16 @@ from logger_config import get_logger
 
 logger = get_logger(__name__)
 
+# One pass over the source for _calculate_code_metrics: public/external
+# function headers (visibility follows the parameter list), other
+# function declarations, and control-flow keywords/operators
+_CODE_METRICS_RE = re.compile(
+    r'(?P<public>function\s+\w+\s*\([^)]*\)[^{;]*\b(?:public|external)\b)'
+    r'|(?P<function>function\s+\w+\s*\()'
+    r'|\b(?:if|else|for|while|case|catch)\b|&&|\|\||\?',
+    re.IGNORECASE
+)
+
 
 @dataclass
 class ProfessionalAuditResult:
@@ -235,26 +246,19 @@ class ProfessionalAuditor:
     
     def _calculate_code_metrics(self, contract_code: str) -> Dict:
         """Calculate code complexity metrics"""
-        import re
-        
-        lines = contract_code.split('\n')
-        
-        # Count functions
-        function_pattern = r'function\s+\w+\s*\('
-        functions = re.findall(function_pattern, contract_code, re.IGNORECASE)
-        function_count = len(functions)
-        
-        # Count public/external functions
-        public_pattern = r'(?:public|external)\s+function'
-        public_functions = re.findall(public_pattern, contract_code, re.IGNORECASE)
-        public_function_count = len(public_functions)
-        
-        # Simple cyclomatic complexity estimate
-        # Count control flow statements
-        complexity_keywords = ['if', 'else', 'for', 'while', 'case', 'catch', '&&', '||', '?']
+        function_count = 0
+        public_function_count = 0
+        # Simple cyclomatic complexity estimate: control flow statements
         complexity = 1  # Base complexity
-        for keyword in complexity_keywords:
-            complexity += len(re.findall(rf'\b{keyword}\b', contract_code, re.IGNORECASE))
+        for match in _CODE_METRICS_RE.finditer(contract_code):
+            kind = match.lastgroup
+            if kind == "function":
+                function_count += 1
+            elif kind == "public":
+                function_count += 1
+                public_function_count += 1
+            else:
+                complexity += 1
         
         # Normalize by function count
         if function_count > 0:
@@ -5,6 +5,7 @@ Detects common vulnerabilities using improved pattern matching with context awar
 
 import re
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import List, Optional, Dict, Tuple, Set
 from app_config import VULN_TYPES, SEVERITY_LEVELS, get_config
 from logger_config import get_logger
@@ -15,6 +16,18 @@ logger = get_logger(__name__)
 config = get_config()
 
 
+@lru_cache(maxsize=None)
+def _swc_fields(vuln_type: str) -> Dict[str, str]:
+    """SWC classification fields for a vulnerability type (fixed per type, so cached)"""
+    swc_info = get_swc_info(vuln_type)
+    return {
+        "swc_id": swc_info.get("swc_id", "N/A"),
+        "swc_title": swc_info.get("swc_title", "N/A"),
+        "cwe": swc_info.get("cwe", "N/A"),
+        "owasp": swc_info.get("owasp", "N/A")
+    }
+
+
 @dataclass
 class Vulnerability:
     """Represents a detected vulnerability"""
@@ -41,11 +54,7 @@ class Vulnerability:
         
         # Add SWC classification for professional audits
         try:
-            swc_info = get_swc_info(self.vuln_type)
-            base_dict["swc_id"] = swc_info.get("swc_id", "N/A")
-            base_dict["swc_title"] = swc_info.get("swc_title", "N/A")
-            base_dict["cwe"] = swc_info.get("cwe", "N/A")
-            base_dict["owasp"] = swc_info.get("owasp", "N/A")
+            base_dict.update(_swc_fields(self.vuln_type))
         except:
             pass  # Don't fail if SWC registry not available
         
@@ -276,7 +285,7 @@ class StaticAnalyzer:
             result = AnalysisResult(contract_name=contract_name)
             result.lines_of_code = len(contract_code.split('\n'))
             
-            if not contract_code.strip():
+            if not contract_code or contract_code.isspace():
                 logger.warning(f"Empty contract code for {contract_name}")
                 return result
             
@@ -0,0 +1,243 @@
+from fastapi.testclient import TestClient
+
+import fastapi_api
+
+
+client = TestClient(fastapi_api.app)
+
+CONTRACT = "pragma solidity ^0.8.0; contract Cached { function f() public {} }"
+
+
+def _payload(name="Cached"):
+    return {
+        "contract_code": CONTRACT,
+        "contract_name": name,
+        "use_llm_audit": False,
+    }
+
+
+def test_analyze_static_only_populates_cache():
+    fastapi_api.analysis_cache.clear()
+    resp = client.post("/analyze", json=_payload())
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["contract_name"] == "Cached"
+    assert data["llm_audit"] is None
+    assert fastapi_api.analysis_cache.get(CONTRACT, "Cached") is not None
+
+
+def test_analyze_etag_not_modified():
+    fastapi_api.analysis_cache.clear()
+    first = client.post("/analyze", json=_payload())
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+
+    second = client.post("/analyze", json=_payload(), headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+
+
+def test_analyze_invalid_name_rejected():
+    resp = client.post("/analyze", json=_payload(name="Bad-Name"))
+    assert resp.status_code == 400
+
+
+def test_analyze_batch_preserves_order_and_errors():
+    payload = [
+        _payload(name="First"),
+        _payload(name="Bad-Name"),
+        _payload(name="Third"),
+    ]
+    resp = client.post("/analyze-batch", json=payload)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [item["contract_name"] for item in data] == ["First", "Bad-Name", "Third"]
+    assert "error" in data[1]
+    assert "error" not in data[0] and "error" not in data[2]
+
+
+def test_static_definition_endpoints():
+    resp = client.get("/vulnerabilities")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/json"
+    data = resp.json()
+    assert data["total"] == len(data["vulnerabilities"])
+    assert "reentrancy" in data["vulnerabilities"]
+
+    resp = client.get("/swc-registry")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["total_swc_issues_detected"] == len(data["swc_registry"])
+
+
+def test_utcnow_iso_format():
+    import re
+
+    stamp = fastapi_api._utcnow_iso()
+    assert re.fullmatch(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{3}Z", stamp)
+
+
+def test_analyze_sends_webhooks_as_background_task(monkeypatch):
+    calls = []
+
+    async def fake_notify(contract_name, analysis_result, analysis_id=None):
+        calls.append((contract_name, analysis_result["severity"]))
+
+    manager = fastapi_api.webhook_manager
+    monkeypatch.setattr(manager, "webhooks", [{"id": "test"}])
+    monkeypatch.setattr(manager, "notify_analysis_completed", fake_notify)
+    fastapi_api.analysis_cache.clear()
+
+    resp = client.post("/analyze", json=_payload(name="Hooked"))
+    assert resp.status_code == 200
+    assert calls == [("Hooked", resp.json()["severity"])]
+
+
+def test_analyze_cache_hit_matches_fresh_result():
+    fastapi_api.analysis_cache.clear()
+    fresh = client.post("/analyze", json=_payload())
+    cached = client.post("/analyze", json=_payload())
+    assert cached.status_code == 200
+    assert cached.headers["etag"] == fresh.headers["etag"]
+    assert cached.json() == fresh.json()
+
+
+def test_shared_http_client_lifecycle():
+    import asyncio
+
+    async def lifecycle():
+        async with fastapi_api.lifespan(fastapi_api.app):
+            http_client = fastapi_api.app.state.http
+            assert fastapi_api.webhook_manager._get_client() is http_client
+        return http_client
+
+    http_client = asyncio.run(lifecycle())
+    assert http_client.is_closed
+    assert fastapi_api.webhook_manager._client is None
+
+
+def _upload(data, filename="Upload.sol"):
+    return client.post(
+        "/upload-and-analyze",
+        files={"file": (filename, data, "text/plain")},
+    )
+
+
+def test_upload_and_analyze_decodes_utf8():
+    code = "pragma solidity ^0.8.0;\n// héllo\ncontract Upload { function f() public {} }"
+    resp = _upload(code.encode("utf-8"))
+    assert resp.status_code == 200
+    assert resp.json()["contract_name"] == "Upload"
+
+
+def test_upload_and_analyze_rejects_oversized(monkeypatch):
+    monkeypatch.setattr(fastapi_api, "MAX_FILE_SIZE_BYTES", 8)
+    resp = _upload(CONTRACT.encode("utf-8"))
+    assert resp.status_code == 413
+
+
+def test_upload_and_analyze_rejects_invalid_utf8():
+    resp = _upload(b"contract X { \xff }")
+    assert resp.status_code == 400
+
+
+def test_request_id_header():
+    first = client.get("/health").headers["x-request-id"]
+    second = client.get("/health").headers["x-request-id"]
+    assert len(first) == 32 and int(first, 16) >= 0
+    assert first != second
+
+
+def test_compute_cors_origins():
+    compute = fastapi_api._compute_cors_origins
+    assert compute("*", False) == (("*",), False)
+    assert compute("https://a.example, https://b.example,", False) == (
+        ("https://a.example", "https://b.example"),
+        True,
+    )
+    origins, allow_creds = compute("*", True)
+    assert "*" not in origins
+    assert allow_creds is False
+
+
+def test_analyze_sarif():
+    resp = client.post("/analyze-sarif", json=_payload(name="Sarif"))
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/sarif+json")
+    sarif = resp.json()
+    assert sarif["version"] == "2.1.0"
+    assert sarif["runs"][0]["properties"]["contractName"] == "Sarif"
+
+
+def test_upload_and_analyze_rejects_non_sol():
+    resp = _upload(CONTRACT.encode("utf-8"), filename="contract.txt")
+    assert resp.status_code == 400
+
+
+def test_upload_and_analyze_accepts_uppercase_suffix():
+    resp = _upload(CONTRACT.encode("utf-8"), filename="Upper.SOL")
+    assert resp.status_code == 200
+    assert resp.json()["contract_name"] == "Upper"
+
+
+def test_root_serves_cached_homepage(monkeypatch):
+    resp = client.get("/")
+    assert resp.status_code == 200
+    assert resp.content == fastapi_api._INDEX_HTML
+    
+    monkeypatch.setattr(fastapi_api, "_INDEX_HTML", None)
+    resp = client.get("/")
+    assert resp.json()["name"] == "Solidity Vuln Scanner API"
+
+
+def test_llm_audit_reused_from_shared_cache(monkeypatch):
+    from types import SimpleNamespace
+    from llm_auditor import LLMAuditResult
+    
+    calls = []
+    
+    async def audit_async(code, name):
+        calls.append(name)
+        return LLMAuditResult("audited", [], [], [], "LOW", tokens_used=5)
+    
+    fake = SimpleNamespace(provider="openai", model="m", supports_async=True, audit_async=audit_async)
+    monkeypatch.setattr(fastapi_api, "llm_auditor", fake)
+    fastapi_api.analysis_cache.clear()
+    
+    payload = {**_payload(), "use_llm_audit": True}
+    first = client.post("/analyze", json=payload)
+    second = client.post("/analyze", json=payload)
+    assert first.status_code == second.status_code == 200
+    assert second.json()["llm_audit"]["summary"] == "audited"
+    assert calls == ["Cached"]
+
+
+def test_llm_cache_entry_not_served_by_static_fast_path(monkeypatch):
+    from types import SimpleNamespace
+    
+    fake = SimpleNamespace(provider="openai", model="m")
+    monkeypatch.setattr(fastapi_api, "llm_auditor", fake)
+    fastapi_api.analysis_cache.clear()
+    fastapi_api.analysis_cache.set_by_hash(
+        fastapi_api._llm_cache_key(CONTRACT, "Cached"), {"summary": "llm"}
+    )
+    
+    resp = client.post("/analyze", json=_payload(name="Cached\x00llm\x00openai\x00m"))
+    assert resp.status_code == 400
+    assert "summary" not in resp.json()
+
+
+def test_analyze_cache_miss_looks_up_once(monkeypatch):
+    fastapi_api.analysis_cache.clear()
+    lookups = []
+    original = fastapi_api.analysis_cache.aget_by_hash
+    
+    async def counting_get(key):
+        lookups.append(key)
+        return await original(key)
+    
+    monkeypatch.setattr(fastapi_api.analysis_cache, "aget_by_hash", counting_get)
+    resp = client.post("/analyze", json=_payload(name="MissOnce"))
+    assert resp.status_code == 200
+    assert len(lookups) == 1
@@ -37,3 +37,17 @@ def test_cross_validate_requires_code():
     resp = client.post("/cross-validate", json=payload)
     assert resp.status_code == 400
 
+
+
+def test_cross_validate_size_limit_counts_bytes(monkeypatch):
+    code = "pragma solidity ^0.8.0; contract X {} // " + "é" * 20
+    monkeypatch.setattr(fastapi_api, "MAX_FILE_SIZE_BYTES", len(code) + 5)
+    payload = {
+        "contract_code": code,
+        "contract_name": "X",
+        "use_llm_audit": False,
+        "run_slither": False,
+        "run_mythril": False,
+    }
+    resp = client.post("/cross-validate", json=payload)
+    assert resp.status_code == 413
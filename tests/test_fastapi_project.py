@@ -0,0 +1,60 @@
+import asyncio
+import io
+import zipfile
+
+from fastapi.testclient import TestClient
+
+import fastapi_api
+
+
+client = TestClient(fastapi_api.app)
+
+CONTRACT = "pragma solidity ^0.8.0; contract A { function f() public {} }"
+
+
+def _zip_bytes(files):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, content in files.items():
+            zf.writestr(name, content)
+    return buf.getvalue()
+
+
+def _post(data, filename="project.zip"):
+    return client.post(
+        "/analyze-project",
+        files={"file": (filename, data, "application/zip")},
+    )
+
+
+def test_analyze_project_zip():
+    resp = _post(_zip_bytes({"contracts/A.sol": CONTRACT}))
+    assert resp.status_code == 200
+    assert resp.json()["files_analyzed"] == 1
+
+
+def test_analyze_project_rejects_oversized_member(monkeypatch):
+    monkeypatch.setattr(fastapi_api, "MAX_EXTRACTED_FILE_BYTES", 16)
+    resp = _post(_zip_bytes({"contracts/A.sol": CONTRACT}))
+    assert resp.status_code == 413
+
+
+def test_analyze_project_rejects_oversized_upload(monkeypatch):
+    monkeypatch.setattr(fastapi_api, "MAX_FILE_SIZE_BYTES", 16)
+    resp = _post(_zip_bytes({"contracts/A.sol": CONTRACT}))
+    assert resp.status_code == 413
+
+
+def test_analyze_project_invalid_zip():
+    resp = _post(b"not a zip")
+    assert resp.status_code == 400
+
+
+def test_analyze_project_after_shutdown():
+    async def lifecycle():
+        async with fastapi_api.lifespan(fastapi_api.app):
+            pass
+
+    asyncio.run(lifecycle())
+    resp = _post(_zip_bytes({"contracts/A.sol": CONTRACT}))
+    assert resp.status_code == 200
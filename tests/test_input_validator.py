@@ -6,7 +6,10 @@ import pytest
 from input_validator import (
     validate_contract_code,
     sanitize_contract_code,
-    validate_contract_name
+    validate_contract_name,
+    validate_and_sanitize,
+    sanitize_filename,
+    _looks_like_solidity
 )
 
 
@@ -53,6 +56,36 @@ class TestContractCodeValidation:
         is_valid, error = validate_contract_code(code)
         assert not is_valid
         assert "too long" in error.lower()
+        assert error.startswith("Line 2 ")
+    
+    def test_long_last_line_rejected(self):
+        """Test that an over-long final line without newline is caught"""
+        code = "pragma solidity ^0.8.0;\ncontract X {}\n" + "x" * 10001
+        is_valid, error = validate_contract_code(code)
+        assert not is_valid
+        assert error.startswith("Line 3 ")
+    
+    def test_line_at_limit_accepted(self):
+        """Test that a line of exactly the maximum length is allowed"""
+        code = "pragma solidity ^0.8.0;\n" + "x" * 10000 + "\ncontract X {}"
+        is_valid, error = validate_contract_code(code)
+        assert is_valid
+        assert error is None
+
+
+class TestSolidityDetection:
+    """Test the keyword-based Solidity detection"""
+    
+    def test_keywords_detected_case_insensitively(self):
+        assert _looks_like_solidity("PRAGMA SOLIDITY ^0.8.0;")
+        assert _looks_like_solidity("contract Token {}")
+    
+    def test_keyword_after_prefix_detected(self):
+        code = "// " + "x" * 5000 + "\ncontract Late {}"
+        assert _looks_like_solidity(code)
+    
+    def test_non_solidity_not_detected(self):
+        assert not _looks_like_solidity("def main():\n    pass")
 
 
 class TestContractCodeSanitization:
@@ -76,6 +109,35 @@ class TestContractCodeSanitization:
         code = "pragma solidity ^0.8.0; contract X {}"
         sanitized = sanitize_contract_code(code)
         assert sanitized == code
+    
+    def test_clean_code_not_copied(self):
+        """Test that clean input is returned as-is (ASCII and Unicode)"""
+        ascii_code = "pragma solidity ^0.8.0;\ncontract X {}"
+        unicode_code = "pragma solidity ^0.8.0;\n// café\ncontract X {}"
+        assert sanitize_contract_code(ascii_code) is ascii_code
+        assert sanitize_contract_code(unicode_code) is unicode_code
+    
+    def test_unicode_format_characters_removed(self):
+        """Test that zero-width/format characters are stripped"""
+        code = "contract X\u200b {}\n// é"
+        assert sanitize_contract_code(code) == "contract X {}\n// é"
+
+
+class TestFilenameSanitization:
+    """Test filename sanitization"""
+    
+    def test_strips_separators_and_reserved_chars(self):
+        assert sanitize_filename('../a\\b<>:"|?*.sol') == "ab.sol"
+    
+    def test_strips_control_chars(self):
+        assert sanitize_filename("a\x00\x1f\x7fb.sol") == "ab.sol"
+    
+    def test_strips_non_ascii_format_chars(self):
+        assert sanitize_filename("caf\u00e9\u200b.sol") == "caf\u00e9.sol"
+    
+    def test_empty_falls_back(self):
+        assert sanitize_filename("..") == "contract.sol"
+        assert sanitize_filename("<>") == "contract.sol"
 
 
 class TestContractNameValidation:
@@ -87,6 +149,12 @@ class TestContractNameValidation:
         assert not is_valid
         assert "empty" in error.lower()
     
+    def test_whitespace_name_rejected(self):
+        """Test that whitespace-only name is rejected"""
+        is_valid, error = validate_contract_name("   ")
+        assert not is_valid
+        assert "empty" in error.lower()
+    
     def test_valid_name_accepted(self):
         """Test that valid names are accepted"""
         valid_names = ["MyContract", "Token_ERC20", "Vault_v2", "_private"]
@@ -103,9 +171,55 @@ class TestContractNameValidation:
             assert not is_valid, f"Name '{name}' should be invalid"
             assert "invalid" in error.lower()
     
+    def test_trailing_newline_name_rejected(self):
+        """Test that a trailing newline does not slip past the anchor"""
+        is_valid, error = validate_contract_name("MyContract\n")
+        assert not is_valid
+        assert "invalid" in error.lower()
+    
+    def test_non_ascii_identifier_rejected(self):
+        """Test that Unicode identifiers are rejected"""
+        is_valid, error = validate_contract_name("Contr\u00e4ct")
+        assert not is_valid
+        assert "invalid" in error.lower()
+    
     def test_too_long_name_rejected(self):
         """Test that too long names are rejected"""
         long_name = "A" * 300
         is_valid, error = validate_contract_name(long_name)
         assert not is_valid
         assert "too long" in error.lower()
+
+
+class TestValidateAndSanitize:
+    """Test combined validation and sanitization"""
+    
+    def test_valid_input_sanitized(self):
+        """Test that valid input is returned sanitized"""
+        code = "pragma solidity ^0.8.0;\r\ncontract X {}\x07"
+        sanitized, is_valid, error = validate_and_sanitize(code, "X")
+        assert is_valid
+        assert error is None
+        assert sanitized == "pragma solidity ^0.8.0;\ncontract X {}"
+    
+    def test_invalid_code_rejected(self):
+        """Test that invalid code is rejected"""
+        sanitized, is_valid, error = validate_and_sanitize("   ", "X")
+        assert not is_valid
+        assert sanitized is None
+        assert "empty" in error.lower()
+    
+    def test_invalid_name_rejected(self):
+        """Test that invalid contract names are rejected"""
+        code = "pragma solidity ^0.8.0; contract X {}"
+        sanitized, is_valid, error = validate_and_sanitize(code, "My-Contract")
+        assert not is_valid
+        assert sanitized is None
+        assert "invalid" in error.lower()
+    
+    def test_matches_separate_sanitizer(self):
+        """Test that results match sanitize_contract_code"""
+        code = "pragma solidity ^0.8.0;\rcontract X { string s = \"café\"; }\x1b"
+        sanitized, is_valid, _ = validate_and_sanitize(code, "X")
+        assert is_valid
+        assert sanitized == sanitize_contract_code(code)
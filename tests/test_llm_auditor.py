@@ -0,0 +1,462 @@
+"""
+Tests for LLM auditor helpers that don't call a provider API
+"""
+
+import asyncio
+import sys
+import types
+from unittest.mock import patch
+
+import pytest
+
+import llm_auditor
+from llm_auditor import LLMAuditor, TRUNCATION_MARKER
+
+# Sync client class each provider SDK exposes
+_SDK_CLIENTS = {"openai": "OpenAI", "anthropic": "Anthropic"}
+
+
+def _auditor(provider="anthropic", model="claude-3-haiku"):
+    """Build a real auditor against a stub provider SDK (no API client)"""
+    sdk = types.ModuleType(provider)
+    setattr(sdk, _SDK_CLIENTS[provider], lambda **kwargs: types.SimpleNamespace(**kwargs))
+    with patch.dict(sys.modules, {provider: sdk}):
+        return LLMAuditor(api_key="test", model=model, provider=provider)
+
+
+class TestTruncation:
+    """Test prompt-budget truncation"""
+    
+    def test_short_contract_returned_as_is(self):
+        code = "pragma solidity ^0.8.0; contract X {}"
+        truncated_code, truncated = _auditor()._truncate_contract(code)
+        assert truncated_code is code
+        assert not truncated
+    
+    def test_char_budget_fallback(self, monkeypatch):
+        monkeypatch.setattr(llm_auditor.config, "llm_max_contract_size", 10)
+        assert _auditor()._truncate_contract("x" * 50) == ("x" * 10, True)
+    
+    def test_prompt_embeds_marker_when_truncated(self):
+        auditor = _auditor()
+        assert TRUNCATION_MARKER in auditor._build_audit_prompt("x", "X", truncated=True)
+        assert TRUNCATION_MARKER not in auditor._build_audit_prompt("x", "X")
+    
+    def test_prompt_template_keeps_code_braces(self):
+        prompt = _auditor()._build_audit_prompt("contract X { uint a; }", "X")
+        assert 'smart contract "X"' in prompt
+        assert "contract X { uint a; }" in prompt
+        assert "{{" not in prompt
+    
+    @pytest.mark.skipif(not llm_auditor.TIKTOKEN_AVAILABLE, reason="tiktoken not installed")
+    def test_token_budget_with_tiktoken(self, monkeypatch):
+        monkeypatch.setattr(llm_auditor.config, "llm_max_contract_tokens", 5)
+        auditor = _auditor(provider="openai", model="gpt-4o-mini")
+        body, truncated = auditor._truncate_contract("word " * 100)
+        assert truncated
+        assert len(llm_auditor._get_token_encoder("gpt-4o-mini").encode(body)) <= 5
+
+
+class TestAnthropicAsync:
+    """Test the async Anthropic path with a stub client"""
+    
+    def test_audit_async_uses_async_client(self):
+        from types import SimpleNamespace
+        
+        class FakeMessages:
+            async def create(self, **kwargs):
+                return SimpleNamespace(
+                    content=[SimpleNamespace(text='{"summary": "ok", "risk_assessment": "LOW"}')],
+                    usage=SimpleNamespace(input_tokens=3, output_tokens=4)
+                )
+        
+        auditor = _auditor()
+        auditor.supports_async = True
+        auditor._async_client = SimpleNamespace(messages=FakeMessages())
+        
+        result = asyncio.run(auditor.audit_async("contract X { function f() public {} }", "X"))
+        assert result.summary == "ok"
+        assert result.risk_assessment == "LOW"
+        assert result.tokens_used == 7
+
+
+
+class TestResultCache:
+    """Test memoization of audit results"""
+    
+    def test_identical_contract_hits_cache(self):
+        from llm_auditor import LLMAuditResult
+        
+        calls = []
+        auditor = _auditor()
+        
+        def fake_audit(contract_code, contract_name, truncated=False):
+            calls.append(contract_name)
+            return LLMAuditResult("s", [], [], [], "LOW", tokens_used=10)
+        
+        auditor._audit_with_anthropic = fake_audit
+        first = auditor.audit("contract X { function f() public {} }", "X")
+        second = auditor.audit("contract X { function f() public {} }", "X")
+        auditor.audit("contract X { function f() public {} }", "Y")
+        
+        assert first is second
+        assert calls == ["X", "Y"]
+    
+    def test_cache_disabled(self, monkeypatch):
+        from llm_auditor import LLMAuditResult
+        
+        monkeypatch.setattr(llm_auditor.config, "llm_cache_max_size", 0)
+        auditor = _auditor()
+        auditor._audit_with_anthropic = lambda code, name, truncated=False: LLMAuditResult("s", [], [], [], "LOW")
+        auditor.audit("contract X { function f() public {} }", "X")
+        assert auditor._result_cache == {}
+
+
+class TestResponseParsing:
+    """Test strict and loose parsing of model output"""
+    
+    def test_strict_json(self):
+        result = _auditor()._parse_strict_json('{"summary": "ok", "risk_assessment": "LOW"}')
+        assert result.summary == "ok"
+        assert result.risk_assessment == "LOW"
+    
+    def test_strict_falls_back_to_loose(self):
+        result = _auditor()._parse_strict_json('Here you go: {"summary": "ok"} thanks')
+        assert result.summary == "ok"
+    
+    def test_loose_plain_text(self):
+        result = _auditor()._parse_loose_json("No issues found.")
+        assert result.summary == "No issues found."
+        assert result.risk_assessment == "MEDIUM"
+
+
+class TestHttpPool:
+    """Test provider connection pool settings"""
+    
+    def test_http_limits(self):
+        limits = llm_auditor._http_limits()
+        assert limits.max_connections == llm_auditor.LLM_HTTP_MAX_CONNECTIONS
+        assert limits.max_keepalive_connections == llm_auditor.LLM_HTTP_MAX_KEEPALIVE
+    
+    def test_http_timeout_uses_config(self, monkeypatch):
+        monkeypatch.setattr(llm_auditor.config, "llm_request_timeout", 15.0)
+        timeout = llm_auditor._http_timeout()
+        assert timeout.read == 15.0
+        assert timeout.connect == 10.0
+    
+    def test_aclose_releases_async_client(self):
+        closed = []
+        
+        class FakeClient:
+            async def close(self):
+                closed.append(True)
+        
+        auditor = _auditor()
+        auditor._async_client = FakeClient()
+        asyncio.run(auditor.aclose())
+        asyncio.run(auditor.aclose())
+        assert closed == [True]
+        assert auditor._async_client is None
+
+
+class TestInflightCoalescing:
+    """Test sharing of concurrent identical async audits"""
+    
+    def test_concurrent_identical_audits_share_one_call(self):
+        from llm_auditor import LLMAuditResult
+        
+        calls = []
+        auditor = _auditor()
+        auditor.supports_async = True
+        
+        async def fake_audit(contract_code, contract_name, truncated=False):
+            calls.append(contract_name)
+            await asyncio.sleep(0.01)
+            return LLMAuditResult("s", [], [], [], "LOW")
+        
+        auditor._audit_with_anthropic_async = fake_audit
+        
+        async def run():
+            return await asyncio.gather(
+                *(auditor.audit_async("contract X { function f() public {} }", "X") for _ in range(5))
+            )
+        
+        results = asyncio.run(run())
+        assert calls == ["X"]
+        assert all(r is results[0] for r in results)
+        assert auditor._inflight == {}
+
+
+class TestThrottling:
+    """Test proactive RPM/TPM throttling"""
+    
+    def test_token_bucket_waits_for_refill(self):
+        import time
+        
+        bucket = llm_auditor._TokenBucket(per_minute=600)  # 10 per second
+        
+        async def run():
+            await bucket.acquire(600)
+            start = time.monotonic()
+            await bucket.acquire(1)
+            return time.monotonic() - start
+        
+        assert asyncio.run(run()) >= 0.05
+    
+    def test_throttled_limits_concurrency(self, monkeypatch):
+        monkeypatch.setattr(llm_auditor.config, "llm_max_concurrency", 2)
+        auditor = _auditor()
+        active = []
+        peak = []
+        
+        async def call():
+            async with auditor._throttled("prompt", max_tokens=10):
+                active.append(1)
+                peak.append(len(active))
+                await asyncio.sleep(0.01)
+                active.pop()
+        
+        async def run():
+            await asyncio.gather(*(call() for _ in range(6)))
+        
+        asyncio.run(run())
+        assert max(peak) == 2
+
+
+class TestMinify:
+    """Test comment/indentation stripping for LLM prompts"""
+    
+    def test_strips_comments_and_keeps_line_numbers(self):
+        code = (
+            "// SPDX-License-Identifier: MIT\n"
+            "/**\n * @title X\n */\n"
+            "contract X {\n"
+            "    uint a = 1; // note\n"
+            "}\n"
+        )
+        minified = llm_auditor._minify_solidity(code)
+        assert "SPDX" not in minified and "@title" not in minified and "note" not in minified
+        assert minified.count("\n") == code.count("\n")
+        assert minified.splitlines()[5] == "uint a = 1;"
+    
+    def test_keeps_comment_markers_inside_strings(self):
+        code = 'string u = "https://x.y/*z*/"; string q = \'a//b\';'
+        assert llm_auditor._minify_solidity(code) == code
+
+
+class TestRetry:
+    """Test retry of transient async API failures"""
+    
+    def test_retryable_classification(self):
+        class StatusError(Exception):
+            def __init__(self, status_code):
+                self.status_code = status_code
+        
+        assert llm_auditor._is_retryable(asyncio.TimeoutError())
+        assert llm_auditor._is_retryable(StatusError(429))
+        assert llm_auditor._is_retryable(StatusError(503))
+        assert not llm_auditor._is_retryable(StatusError(400))
+        assert not llm_auditor._is_retryable(ValueError("bad"))
+    
+    @pytest.mark.skipif(not llm_auditor.RETRY_AVAILABLE, reason="tenacity not installed")
+    def test_transient_errors_retried(self, monkeypatch):
+        import tenacity
+        
+        monkeypatch.setattr(tenacity, "wait_exponential_jitter", lambda **kwargs: tenacity.wait_none())
+        calls = []
+        
+        async def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise asyncio.TimeoutError()
+            return "ok"
+        
+        assert asyncio.run(llm_auditor._call_with_retry(flaky)) == "ok"
+        assert len(calls) == 3
+    
+    def test_permanent_errors_not_retried(self):
+        calls = []
+        
+        async def broken():
+            calls.append(1)
+            raise ValueError("bad request")
+        
+        with pytest.raises(ValueError):
+            asyncio.run(llm_auditor._call_with_retry(broken))
+        assert len(calls) == 1
+
+
+class TestAuditMany:
+    """Test bulk audits with and without the Batch API"""
+    
+    def test_concurrent_without_batch_api(self):
+        from llm_auditor import LLMAuditResult
+        
+        auditor = _auditor()
+        auditor.supports_async = True
+        
+        async def fake_audit(contract_code, contract_name, truncated=False):
+            return LLMAuditResult(contract_name, [], [], [], "LOW")
+        
+        auditor._audit_with_anthropic_async = fake_audit
+        results = asyncio.run(auditor.audit_many([("contract A { function f() public {} }", "A"), ("contract B { function f() public {} }", "B")]))
+        assert [r.summary for r in results] == ["A", "B"]
+    
+    def test_openai_batch_api(self, monkeypatch):
+        import json
+        from types import SimpleNamespace
+        
+        monkeypatch.setattr(llm_auditor.config, "llm_use_batch_api", True)
+        monkeypatch.setattr(llm_auditor.config, "llm_batch_poll_seconds", 0)
+        submitted = {}
+        
+        class FakeFiles:
+            async def create(self, file, purpose):
+                submitted["lines"] = file[1].decode().splitlines()
+                return SimpleNamespace(id="file-in")
+            
+            async def content(self, file_id):
+                lines = []
+                for line in submitted["lines"]:
+                    request = json.loads(line)
+                    name = request["custom_id"]
+                    lines.append(json.dumps({
+                        "custom_id": name,
+                        "response": {"body": {
+                            "choices": [{"message": {"content": json.dumps({"summary": f"batch-{name}"})}}],
+                            "usage": {"total_tokens": 7}
+                        }}
+                    }))
+                return SimpleNamespace(text="\n".join(lines))
+        
+        class FakeBatches:
+            async def create(self, **kwargs):
+                return SimpleNamespace(id="batch-1", status="in_progress", output_file_id=None)
+            
+            async def retrieve(self, batch_id):
+                return SimpleNamespace(id=batch_id, status="completed", output_file_id="file-out")
+        
+        auditor = _auditor(provider="openai", model="gpt-4o-mini")
+        auditor.supports_async = True
+        auditor._async_client = SimpleNamespace(files=FakeFiles(), batches=FakeBatches())
+        
+        results = asyncio.run(auditor.audit_many([("contract A { function f() public {} }", "A"), ("contract B { function f() public {} }", "B")]))
+        assert [r.summary for r in results] == ["batch-0", "batch-1"]
+        assert results[0].tokens_used == 7
+        assert len(submitted["lines"]) == 2
+        
+        # Results land in the cache, so a repeat needs no new batch
+        submitted.clear()
+        again = asyncio.run(auditor.audit_many([("contract A { function f() public {} }", "A")]))
+        assert again[0] is results[0]
+        assert submitted == {}
+
+    
+    def test_packed_contracts_share_one_request(self):
+        import json
+        from types import SimpleNamespace
+        from llm_auditor import LLMAuditResult
+        
+        prompts = []
+        
+        class FakeCompletions:
+            async def create(self, **kwargs):
+                prompts.append(kwargs["messages"][1]["content"])
+                # Answer every contract except the last one
+                results = [{"index": 0, "summary": "packed-A"}, {"index": 1, "summary": "packed-B"}]
+                return SimpleNamespace(
+                    choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps({"results": results})))],
+                    usage=SimpleNamespace(total_tokens=30)
+                )
+        
+        async def fake_single(contract_code, contract_name, truncated=False):
+            return LLMAuditResult(f"single-{contract_name}", [], [], [], "LOW")
+        
+        auditor = _auditor(provider="openai", model="gpt-4o-mini")
+        auditor.supports_async = True
+        auditor._async_client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+        auditor._audit_with_openai_async = fake_single
+        
+        contracts = [(f"contract {n} {{ function f() public {{}} }}", n) for n in "ABC"]
+        results = asyncio.run(auditor.audit_many_concatenated(contracts))
+        
+        assert len(prompts) == 1
+        assert "---CONTRACT 2: C---" in prompts[0]
+        assert [r.summary for r in results] == ["packed-A", "packed-B", "single-C"]
+        assert results[0].tokens_used == 10
+
+
+class TestAuditResult:
+    """Test the LLMAuditResult container"""
+    
+    def test_audit_result_is_slotted(self):
+        from llm_auditor import LLMAuditResult
+        
+        result = LLMAuditResult("s", [], [], [], "LOW")
+        assert not hasattr(result, "__dict__")
+        result.tokens_used = 3
+        assert result.to_dict()["tokens_used"] == 3
+
+
+class TestTrivialInput:
+    """Test that junk input is answered without calling the model"""
+    
+    def test_non_solidity_skips_model(self):
+        auditor = _auditor()
+        auditor.supports_async = True
+        
+        async def fail_audit(*args, **kwargs):
+            raise AssertionError("model should not be called")
+        
+        auditor._audit_with_anthropic_async = fail_audit
+        auditor._audit_with_anthropic = fail_audit
+        inputs = (
+            "hello world, please audit this function",
+            "pragma solidity ^0.8.0;",
+            "pragma solidity ^0.8.0;\n// contract Vault is not written yet\n/* function f() */",
+        )
+        for code in inputs:
+            result = asyncio.run(auditor.audit_async(code, "X"))
+            assert result.summary == "No Solidity contract, library or interface declaration detected"
+            assert result.risk_assessment == "UNKNOWN"
+            assert auditor.audit(code, "X").risk_assessment == "UNKNOWN"
+    
+    def test_contract_without_functions_reaches_model(self):
+        from llm_auditor import LLMAuditResult
+        
+        calls = []
+        auditor = _auditor()
+        auditor.supports_async = True
+        
+        async def fake_audit(contract_code, contract_name, truncated=False):
+            calls.append(contract_name)
+            return LLMAuditResult("audited", [], [], [], "HIGH")
+        
+        auditor._audit_with_anthropic_async = fake_audit
+        code = """contract Vault {
+    mapping(address => uint256) balances;
+    constructor() { balances[msg.sender] = 1; }
+    receive() external payable { balances[msg.sender] += msg.value; }
+    fallback() external payable { selfdestruct(payable(msg.sender)); }
+}"""
+        result = asyncio.run(auditor.audit_async(code, "Vault"))
+        assert calls == ["Vault"]
+        assert result.risk_assessment == "HIGH"
+    
+    def test_empty_input_unknown(self):
+        assert _auditor().audit("   ", "X").risk_assessment == "UNKNOWN"
+    
+    def test_contract_minified_once(self, monkeypatch):
+        import llm_auditor
+        
+        calls = []
+        original = llm_auditor._minify_solidity
+        
+        def counting_minify(code):
+            calls.append(code)
+            return original(code)
+        
+        monkeypatch.setattr(llm_auditor, "_minify_solidity", counting_minify)
+        trivial, code, truncated = _auditor()._prepare_contract("contract A {\n    // note\n}")
+        assert trivial is None
+        assert len(calls) == 1
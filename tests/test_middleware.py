@@ -4,6 +4,7 @@ Tests for middleware (rate limiting, caching)
 
 import pytest
 import time
+import asyncio
 from middleware import RateLimiter, AnalysisCache
 
 
@@ -47,6 +48,27 @@ class TestRateLimiter:
         assert limiter.get_remaining(key) == 4
         limiter.is_allowed(key)
         assert limiter.get_remaining(key) == 3
+    
+    def test_previous_window_weighted(self, monkeypatch):
+        """Test that the previous window counts in proportion to its overlap"""
+        limiter = RateLimiter(max_requests=10, window_seconds=60)
+        key = "test_ip"
+        
+        monkeypatch.setattr(time, "time", lambda: 6000.0)
+        for _ in range(10):
+            assert limiter.is_allowed(key)
+        assert not limiter.is_allowed(key)
+        
+        # A quarter into the next window, 75% of the previous count remains
+        monkeypatch.setattr(time, "time", lambda: 6075.0)
+        assert limiter.get_remaining(key) == 3
+        for _ in range(3):
+            assert limiter.is_allowed(key)
+        assert not limiter.is_allowed(key)
+        
+        # Two windows later nothing carries over
+        monkeypatch.setattr(time, "time", lambda: 6200.0)
+        assert limiter.get_remaining(key) == 10
 
 
 class TestAnalysisCache:
@@ -104,6 +126,30 @@ class TestAnalysisCache:
         assert cache.get("code2", "name2") is not None
         assert cache.get("code3", "name3") is not None
     
+    def test_cache_evicts_least_recently_used(self):
+        """Test that a cache hit protects an entry from eviction"""
+        cache = AnalysisCache(max_size=2, ttl_seconds=60)
+        
+        cache.set("code1", "name1", {"data": 1})
+        cache.set("code2", "name2", {"data": 2})
+        assert cache.get("code1", "name1") is not None
+        
+        cache.set("code3", "name3", {"data": 3})
+        
+        assert cache.get("code1", "name1") is not None
+        assert cache.get("code2", "name2") is None
+    
+    def test_cache_overwrite_does_not_evict(self):
+        """Test that re-setting an existing key keeps other entries"""
+        cache = AnalysisCache(max_size=2, ttl_seconds=60)
+        
+        cache.set("code1", "name1", {"data": 1})
+        cache.set("code2", "name2", {"data": 2})
+        cache.set("code2", "name2", {"data": 3})
+        
+        assert cache.get("code1", "name1") == {"data": 1}
+        assert cache.get("code2", "name2") == {"data": 3}
+    
     def test_cache_key_generation(self):
         """Test that cache keys are generated correctly"""
         cache = AnalysisCache()
@@ -129,3 +175,137 @@ class TestAnalysisCache:
         assert len(key) == 64
         # Should be valid hex
         assert all(c in '0123456789abcdef' for c in key)
+    
+    def test_hash_key_roundtrip(self):
+        """Test that get/set and get_by_hash/set_by_hash share keys"""
+        cache = AnalysisCache(max_size=10, ttl_seconds=60)
+        key = cache.hash_key("code", "Name")
+        
+        assert len(key) == 32
+        assert key != cache.hash_key("code", "Other")
+        assert key != cache.hash_key("code", "Name", kind="llm:openai:gpt-4o-mini")
+        
+        cache.set_by_hash(key, {"result": "ok"})
+        assert cache.get("code", "Name") == {"result": "ok"}
+        
+        cache.set("code2", "Name", {"result": "two"})
+        assert cache.get_by_hash(cache.hash_key("code2", "Name")) == {"result": "two"}
+
+
+class FakeRedis:
+    """Minimal async stand-in for redis.asyncio.Redis"""
+    
+    def __init__(self, fail=False):
+        self.store = {}
+        self.fail = fail
+    
+    async def get(self, key):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return self.store.get(key)
+    
+    async def set(self, key, value, ex=None):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.store[key] = value
+    
+    async def delete(self, key):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.store.pop(key, None)
+    
+    async def eval(self, script, numkeys, curr_key, prev_key, overlap, max_requests, expire):
+        """Emulate the rate-limit Lua script"""
+        if self.fail:
+            raise ConnectionError("redis down")
+        rate = self.store.get(prev_key, 0) * overlap + self.store.get(curr_key, 0)
+        if rate >= max_requests:
+            return [0, str(rate)]
+        self.store[curr_key] = self.store.get(curr_key, 0) + 1
+        return [1, str(rate + 1)]
+
+
+class TestAnalysisCacheRedis:
+    """Test the optional Redis layer of AnalysisCache"""
+    
+    def _cache_with(self, fake):
+        cache = AnalysisCache(max_size=10, ttl_seconds=60)
+        cache.redis_url = "redis://test"
+        cache._redis = fake
+        return cache
+    
+    def test_shared_between_instances(self):
+        """Test that a result stored by one worker is seen by another"""
+        fake = FakeRedis()
+        writer = self._cache_with(fake)
+        reader = self._cache_with(fake)
+        key = writer.hash_key("code", "Name")
+        
+        asyncio.run(writer.aset_by_hash(key, {"risk_score": 5}))
+        assert asyncio.run(reader.aget_by_hash(key)) == {"risk_score": 5}
+        # Promoted into the reader's in-process cache
+        assert reader.get_by_hash(key) == {"risk_score": 5}
+    
+    def test_degrades_when_redis_fails(self):
+        """Test that Redis errors fall back to the in-process cache"""
+        cache = self._cache_with(FakeRedis(fail=True))
+        key = cache.hash_key("code", "Name")
+        
+        asyncio.run(cache.aset_by_hash(key, {"risk_score": 5}))
+        assert asyncio.run(cache.aget_by_hash(key)) == {"risk_score": 5}
+        assert cache._get_redis() is None
+    
+    def test_corrupt_entry_is_a_miss(self):
+        """Test that an undecodable Redis value is treated as a miss and removed"""
+        fake = FakeRedis()
+        cache = self._cache_with(fake)
+        key = cache.hash_key("code", "Name")
+        for payload in (b'{"risk_score": 5', b'\xff\xfe not json'):
+            fake.store[cache._redis_key(key)] = payload
+            assert asyncio.run(cache.aget_by_hash(key)) is None
+            assert cache._redis_key(key) not in fake.store
+        assert cache._get_redis() is fake
+    
+    def test_disabled_without_url(self):
+        """Test that async methods work as plain in-process cache"""
+        cache = AnalysisCache(max_size=10, ttl_seconds=60)
+        key = cache.hash_key("code", "Name")
+        assert asyncio.run(cache.aget_by_hash(key)) is None
+        asyncio.run(cache.aset_by_hash(key, {"ok": True}))
+        assert asyncio.run(cache.aget_by_hash(key)) == {"ok": True}
+
+
+class TestRateLimiterRedis:
+    """Test the optional Redis backend of RateLimiter"""
+    
+    def _limiter_with(self, fake, max_requests=3):
+        limiter = RateLimiter(max_requests=max_requests, window_seconds=60)
+        limiter.redis_url = "redis://test"
+        limiter._redis = fake
+        return limiter
+    
+    def test_in_memory_without_redis(self):
+        """Test that acheck uses the in-process counters by default"""
+        limiter = RateLimiter(max_requests=2, window_seconds=60)
+        results = [asyncio.run(limiter.acheck("client")) for _ in range(3)]
+        assert results == [(True, 1), (True, 0), (False, 0)]
+    
+    def test_limit_shared_between_workers(self):
+        """Test that two limiters on one Redis share a single budget"""
+        fake = FakeRedis()
+        first = self._limiter_with(fake, max_requests=3)
+        second = self._limiter_with(fake, max_requests=3)
+        
+        assert asyncio.run(first.acheck("client"))[0]
+        assert asyncio.run(second.acheck("client"))[0]
+        assert asyncio.run(first.acheck("client"))[0]
+        allowed, remaining = asyncio.run(second.acheck("client"))
+        assert not allowed
+        assert remaining == 0
+    
+    def test_falls_back_when_redis_down(self):
+        """Test that a Redis error degrades to in-process limiting"""
+        limiter = self._limiter_with(FakeRedis(fail=True), max_requests=1)
+        assert asyncio.run(limiter.acheck("client")) == (True, 0)
+        assert asyncio.run(limiter.acheck("client")) == (False, 0)
+        assert limiter._get_redis() is None
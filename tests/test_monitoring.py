@@ -0,0 +1,70 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+import monitoring
+from monitoring import MetricsMiddleware
+
+
+def _client():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    
+    @app.get("/items/{i}")
+    async def item(i: int):
+        return {"i": i}
+    
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+    
+    return TestClient(app)
+
+
+def _requests(method, endpoint, status):
+    return REGISTRY.get_sample_value(
+        "scanner_api_requests_total",
+        {"method": method, "endpoint": endpoint, "status": str(status)},
+    ) or 0.0
+
+
+def _observations(method, endpoint):
+    return REGISTRY.get_sample_value(
+        "scanner_api_request_duration_seconds_count",
+        {"method": method, "endpoint": endpoint},
+    ) or 0.0
+
+
+class TestMetricsMiddleware:
+    def test_labels_matched_route_by_template(self):
+        before = _requests("GET", "/items/{i}", 200)
+        client = _client()
+        assert client.get("/items/1").status_code == 200
+        assert client.get("/items/2").status_code == 200
+        assert _requests("GET", "/items/{i}", 200) == before + 2
+        assert _requests("GET", "/items/1", 200) == 0.0
+    
+    def test_unmatched_path_labelled_other(self):
+        before = _requests("GET", monitoring.UNMATCHED_ENDPOINT, 404)
+        assert _client().get("/no-such-page").status_code == 404
+        assert _requests("GET", monitoring.UNMATCHED_ENDPOINT, 404) == before + 1
+    
+    def test_overflow_label_once_cap_reached(self, monkeypatch):
+        # A fresh middleware knows only the overflow label, so a cap of 2
+        # leaves room for exactly one real endpoint
+        monkeypatch.setattr(monitoring, "MAX_ENDPOINT_LABELS", 2)
+        before_ok = _requests("GET", monitoring.OVERFLOW_ENDPOINT, 200)
+        before_missing = _requests("GET", monitoring.OVERFLOW_ENDPOINT, 404)
+        client = _client()
+        assert client.get("/items/1").status_code == 200
+        assert client.get("/no-such-page").status_code == 404
+        assert _requests("GET", monitoring.OVERFLOW_ENDPOINT, 404) == before_missing + 1
+        # The endpoint admitted before the cap keeps its own label
+        assert client.get("/items/3").status_code == 200
+        assert _requests("GET", monitoring.OVERFLOW_ENDPOINT, 200) == before_ok
+    
+    def test_skip_paths_not_measured(self):
+        before = _observations("GET", "/health")
+        assert _client().get("/health").status_code == 200
+        assert _requests("GET", "/health", 200) == 0.0
+        assert _observations("GET", "/health") == before
@@ -0,0 +1,65 @@
+"""
+Tests for the professional audit framework
+"""
+
+from professional_auditor import ProfessionalAuditor
+
+
+CONTRACT = """
+pragma solidity ^0.8.0;
+
+contract Vault {
+    mapping(address => uint256) balances;
+
+    function deposit() public payable {
+        balances[msg.sender] += msg.value;
+    }
+
+    function withdraw(uint256 amount) external {
+        if (amount > 0 && balances[msg.sender] >= amount) {
+            balances[msg.sender] -= amount;
+        } else {
+            revert();
+        }
+    }
+}
+"""
+
+
+class TestCodeMetrics:
+    """Test code complexity metrics"""
+    
+    def test_counts_functions_and_control_flow(self):
+        """Test function, visibility and control-flow counts"""
+        metrics = ProfessionalAuditor()._calculate_code_metrics(CONTRACT)
+        assert metrics["function_count"] == 2
+        assert metrics["public_function_count"] == 2
+        # Base 1 + if + && + else, over 2 functions
+        assert metrics["complexity"] == 2.0
+    
+    def test_visibility_after_parameters(self):
+        """Test that only public/external headers count as public functions"""
+        code = """interface I { function f(uint a) external returns (uint); }
+contract C {
+    function g(uint b) internal pure returns (uint) { return b; }
+    function h() public view onlyOwner returns (uint) { return g(1); }
+}"""
+        metrics = ProfessionalAuditor()._calculate_code_metrics(code)
+        assert metrics["function_count"] == 3
+        assert metrics["public_function_count"] == 2
+    
+    def test_operators_counted_literally(self):
+        """Test that ||, ?, and keywords inside identifiers are handled"""
+        code = "function f() { x = a || b ? c : d; uint iffy; }"
+        metrics = ProfessionalAuditor()._calculate_code_metrics(code)
+        assert metrics["complexity"] == 3.0
+
+
+class TestProfessionalAudit:
+    """Test the end-to-end audit"""
+    
+    def test_audit_completes(self):
+        """Test that an audit runs and records code metrics"""
+        result = ProfessionalAuditor().audit(CONTRACT, "Vault")
+        assert result.function_count == 2
+        assert result.contract_name == "Vault"
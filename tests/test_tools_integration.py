@@ -1,4 +1,4 @@
-from tools_integration import run_slither, run_mythril
+from tools_integration import run_slither, run_mythril, check_slither_installed
 
 
 def test_slither_runs_or_skips():
@@ -18,3 +18,11 @@ def test_mythril_runs_or_skips():
     if not ok:
         assert "myth" in out.lower() or "mythril" in out.lower()
 
+
+
+def test_tool_checks_are_cached():
+    check_slither_installed.cache_clear()
+    first = check_slither_installed()
+    assert check_slither_installed() is first
+    check_slither_installed.cache_clear()
+    assert check_slither_installed() == first
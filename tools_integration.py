@@ -7,12 +7,18 @@ Installation Options:
 2. Docker: Use docker-compose (recommended for production)
 """
 
+import functools
 import os
 import shutil
 import subprocess
 import tempfile
+import threading
+import time
 from pathlib import Path
-from typing import Tuple
+from typing import Callable, Tuple
+
+# How long tool installation checks are cached (seconds)
+TOOL_STATUS_TTL_SECONDS = 300
 
 # Check if Docker is available
 def _docker_available() -> bool:
@@ -30,6 +36,15 @@ def _docker_available() -> bool:
 
 DOCKER_AVAILABLE = _docker_available()
 
+# Slither and Mythril only accept source files, not stdin, so stage
+# contracts on tmpfs (RAM-backed) when available to avoid disk I/O
+_TMPFS_DIR = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+
+def _temp_dir() -> tempfile.TemporaryDirectory:
+    """Create a self-cleaning temporary directory, preferring tmpfs"""
+    return tempfile.TemporaryDirectory(dir=_TMPFS_DIR)
+
 
 def _run_cmd(cmd: list[str], timeout: int = 30) -> Tuple[bool, str]:
     """Run a command and capture stdout/stderr."""
@@ -54,6 +69,32 @@ def _run_cmd(cmd: list[str], timeout: int = 30) -> Tuple[bool, str]:
         return False, f"Error: {str(e)}"
 
 
+def _ttl_cache(ttl_seconds: float) -> Callable:
+    """
+    Cache the result of a zero-argument function for ttl_seconds.
+    The wrapped function exposes cache_clear() to force a re-check.
+    """
+    def decorator(func: Callable) -> Callable:
+        cache: dict = {}
+        lock = threading.Lock()
+        
+        @functools.wraps(func)
+        def wrapper():
+            with lock:
+                entry = cache.get("value")
+                if entry is not None and time.monotonic() - entry[0] < ttl_seconds:
+                    return entry[1]
+            value = func()
+            with lock:
+                cache["value"] = (time.monotonic(), value)
+            return value
+        
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
+
+
+@_ttl_cache(TOOL_STATUS_TTL_SECONDS)
 def check_slither_installed() -> Tuple[bool, str]:
     """Check if Slither is installed (local or Docker) and return status message."""
     # Check local installation
@@ -78,6 +119,7 @@ def check_slither_installed() -> Tuple[bool, str]:
     return False, "Slither not installed. Options: pip install slither-analyzer OR use Docker"
 
 
+@_ttl_cache(TOOL_STATUS_TTL_SECONDS)
 def check_mythril_installed() -> Tuple[bool, str]:
     """Check if Mythril is installed (local or Docker) and return status message."""
     # Check local installation
@@ -135,7 +177,7 @@ def run_slither(contract_code: str, filename: str = "Contract.sol", timeout: int
     # Sanitize filename
     safe_filename = sanitize_filename(filename)
     
-    with tempfile.TemporaryDirectory() as tmpdir:
+    with _temp_dir() as tmpdir:
         try:
             path = Path(tmpdir) / safe_filename
             path.write_text(contract_code, encoding='utf-8')
@@ -164,7 +206,7 @@ def _run_slither_docker(contract_code: str, filename: str, timeout: int) -> Tupl
     
     # Use secure temporary directory (auto-cleans up)
     try:
-        with tempfile.TemporaryDirectory() as tmpdir:
+        with _temp_dir() as tmpdir:
             # Write to secure temporary file
             temp_path = os.path.join(tmpdir, safe_filename)
             with open(temp_path, 'w', encoding='utf-8') as f:
@@ -233,7 +275,7 @@ def run_mythril(contract_code: str, filename: str = "Contract.sol", timeout: int
     # Sanitize filename
     safe_filename = sanitize_filename(filename)
     
-    with tempfile.TemporaryDirectory() as tmpdir:
+    with _temp_dir() as tmpdir:
         try:
             path = Path(tmpdir) / safe_filename
             path.write_text(contract_code, encoding='utf-8')
@@ -258,7 +300,7 @@ def _run_mythril_docker(contract_code: str, filename: str, timeout: int) -> Tupl
     
     # Use secure temporary directory (auto-cleans up)
     try:
-        with tempfile.TemporaryDirectory() as tmpdir:
+        with _temp_dir() as tmpdir:
             # Write to secure temporary file
             temp_path = os.path.join(tmpdir, safe_filename)
             with open(temp_path, 'w', encoding='utf-8') as f:
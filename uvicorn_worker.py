@@ -0,0 +1,24 @@
+"""
+Gunicorn worker class for the API server
+UvicornWorker with the per-worker connection cap from API_LIMIT_CONCURRENCY
+"""
+
+from uvicorn.workers import UvicornWorker
+from app_config import get_config
+
+config = get_config()
+
+
+class ScannerUvicornWorker(UvicornWorker):
+    """
+    UvicornWorker that applies config.api_limit_concurrency
+    
+    UvicornWorker builds its uvicorn Config from CONFIG_KWARGS and a few
+    gunicorn settings only (gunicorn's --worker-connections is not passed
+    on), so the cap has to be set here. Beyond it the worker answers 503.
+    """
+    
+    CONFIG_KWARGS = {
+        **UvicornWorker.CONFIG_KWARGS,
+        "limit_concurrency": config.api_limit_concurrency or None,  # 0 = unlimited
+    }
@@ -18,9 +18,44 @@ config = get_config()
 class WebhookManager:
     """Manages webhook notifications for analysis events"""
     
-    def __init__(self):
+    def __init__(self, max_concurrency: int = 16):
         self.webhooks: List[Dict[str, Any]] = []
         self.timeout = 5.0  # 5 second timeout for webhook calls
+        self.max_concurrency = max_concurrency
+        # Created on first use so they bind to the running event loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._owns_client = True
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Semaphore capping concurrent outbound webhook requests"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+    
+    def use_client(self, client: Optional[httpx.AsyncClient]):
+        """
+        Use an externally managed HTTP client (e.g. the app-wide pool)
+        
+        The caller stays responsible for closing it; pass None to go back
+        to a lazily created client owned by the manager.
+        """
+        self._client = client
+        self._owns_client = client is None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Shared HTTP client (connection pooling across webhook calls)"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+            self._owns_client = True
+        return self._client
+    
+    async def aclose(self):
+        """Close the HTTP client if the manager created it"""
+        if self._client is not None and self._owns_client:
+            await self._client.aclose()
+        self._client = None
+        self._owns_client = True
     
     def register_webhook(
         self,
@@ -55,7 +90,7 @@ class WebhookManager:
         }
         
         self.webhooks.append(webhook)
-        logger.info(f"Registered webhook {webhook_id} for {url}")
+        logger.info("Registered webhook %s for %s", webhook_id, url)
         return webhook_id
     
     def unregister_webhook(self, webhook_id: str) -> bool:
@@ -63,7 +98,7 @@ class WebhookManager:
         for i, webhook in enumerate(self.webhooks):
             if webhook["id"] == webhook_id:
                 self.webhooks.pop(i)
-                logger.info(f"Unregistered webhook {webhook_id}")
+                logger.info("Unregistered webhook %s", webhook_id)
                 return True
         return False
     
@@ -115,17 +150,18 @@ class WebhookManager:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
+            async with self._get_semaphore():
+                response = await self._get_client().post(
                     webhook["url"],
                     json=payload,
-                    headers=headers
+                    headers=headers,
+                    timeout=self.timeout
                 )
-                response.raise_for_status()
-                logger.info(f"Webhook {webhook['id']} triggered successfully: {event}")
-                return True
+            response.raise_for_status()
+            logger.info("Webhook %s triggered successfully: %s", webhook['id'], event)
+            return True
         except Exception as e:
-            logger.error(f"Webhook {webhook['id']} failed: {e}")
+            logger.error("Webhook %s failed: %s", webhook['id'], e)
             return False
     
     async def notify_analysis_completed(
@@ -152,7 +188,7 @@ class WebhookManager:
         if tasks:
             results = await asyncio.gather(*tasks, return_exceptions=True)
             success_count = sum(1 for r in results if r is True)
-            logger.info(f"Notified {success_count}/{len(tasks)} webhooks of analysis completion")
+            logger.info("Notified %d/%d webhooks of analysis completion", success_count, len(tasks))
     
     async def notify_analysis_failed(
         self,